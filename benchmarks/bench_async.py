@@ -0,0 +1,114 @@
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from controllers.async_task_controller import AsyncTaskController
+from controllers.task_controller import TaskController
+from utils.logging_config import configure_logging
+
+# Usage: python -m benchmarks.bench_async [tasks] [requests] [concurrency]
+# Serves the same mix of requests (mostly lookups, pages and searches, one
+# in ten an edit) with at most `concurrency` in flight, first by calling
+# TaskController from a thread pool of that size, then from one event loop
+# through AsyncTaskController. Reports requests per second and latency.
+
+WORDS = ['report', 'budget', 'review', 'email', 'meeting', 'invoice', 'draft', 'plan']
+PRIORITIES = ['High', 'Medium', 'Low']
+
+def build(path, count, rng):
+    controller = TaskController(path)
+    controller.add_tasks(
+        {
+            'title': f"{' '.join(rng.choices(WORDS, k=2))} {rng.randint(1, 5000)}",
+            'description': ' '.join(rng.choices(WORDS, k=6)),
+            'deadline': None,
+            'priority': rng.choice(PRIORITIES)
+        }
+        for _ in range(count)
+    )
+    controller.close()
+
+def make_requests(count, tasks, rng):
+    requests = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            requests.append(('edit_task', (rng.randint(1, tasks), {'priority': rng.choice(PRIORITIES)}), {}))
+        elif roll < 0.2:
+            requests.append(('search_tasks', (f"{rng.choice(WORDS)} {rng.randint(1, 5000)}",), {'limit': 20}))
+        elif roll < 0.3:
+            requests.append(('query_tasks', (), {'status': 'Pending', 'order_by': 'priority', 'limit': 50, 'offset': rng.randint(0, tasks - 50)}))
+        else:
+            requests.append(('get_task_by_id', (rng.randint(1, tasks),), {}))
+    return requests
+
+def summarize(name, elapsed, latencies):
+    latencies.sort()
+    print(
+        f"{name:<28}{len(latencies) / elapsed:>12,.0f}"
+        f"{latencies[len(latencies) // 2] * 1000:>10.2f}"
+        f"{latencies[int(len(latencies) * 0.99)] * 1000:>10.2f}"
+    )
+
+def run_threads(path, requests, concurrency):
+    controller = TaskController(path)
+    latencies = []
+    
+    def serve(request):
+        method, args, kwargs = request
+        start = time.perf_counter()
+        getattr(controller, method)(*args, **kwargs)
+        latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(serve, requests))
+    elapsed = time.perf_counter() - start
+    controller.close()
+    return elapsed, latencies
+
+async def run_async(path, requests, concurrency):
+    controller = await AsyncTaskController.open(path)
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+    
+    async def serve(request):
+        method, args, kwargs = request
+        async with limit:
+            start = time.perf_counter()
+            await getattr(controller, method)(*args, **kwargs)
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(serve(request) for request in requests))
+    elapsed = time.perf_counter() - start
+    await controller.close()
+    return elapsed, latencies
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    configure_logging(level='WARNING')
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source.db')
+        build(source, tasks, rng)
+        requests = make_requests(count, tasks, rng)
+        print(f"{tasks:,} tasks, {count:,} requests, {concurrency} in flight")
+        print(f"{'mode':<28}{'requests/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, runner in [
+            ('TaskController + threads', lambda path: run_threads(path, requests, concurrency)),
+            ('AsyncTaskController', lambda path: asyncio.run(run_async(path, requests, concurrency))),
+        ]:
+            path = os.path.join(tmp, f"{name.split()[0]}.db")
+            shutil.copyfile(source, path)
+            summarize(name, *runner(path))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.bench_indexes import populate
+from utils.database import Database
+from utils.deadlines import deadline_from_ts
+
+# Usage: python -m benchmarks.bench_decode [rows]
+# Compares loading every task as Task objects and as a TaskBatch, and
+# streaming them with iter_tasks, and the cached deadline decoder against
+# datetime.fromtimestamp.
+
+def measure(func):
+    # Timed and traced separately, since tracemalloc slows allocation down
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current, peak
+
+def main():
+    logging.getLogger().setLevel(logging.WARNING)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        db.create_tasks_table(target_version=0)
+        populate(db, rows)
+        db.migrate()
+
+        print(f"{rows:,} rows")
+        print(f"{'load':<28}{'time (s)':>10}{'retained (MB)':>15}{'peak (MB)':>11}")
+        for name, func in [
+            ('get_all_tasks()', db.get_all_tasks),
+            ('get_all_tasks(as_batch=True)', lambda: db.get_all_tasks(as_batch=True)),
+            # Walks every task without keeping them, as the notifier does
+            ('iter_tasks()', lambda: sum(1 for task in db.iter_tasks())),
+        ]:
+            elapsed, current, peak = measure(func)
+            print(f"{name:<28}{elapsed:>10.2f}{current / 2**20:>15.1f}{peak / 2**20:>11.1f}")
+
+        with db.reading() as cursor:
+            deadlines = [row[0] for row in cursor.execute('SELECT deadline_ts FROM tasks')]
+        db.close()
+
+    start = time.perf_counter()
+    for ts in deadlines:
+        datetime.fromtimestamp(ts)
+    uncached_time = time.perf_counter() - start
+    deadline_from_ts.cache_clear()
+    start = time.perf_counter()
+    for ts in deadlines:
+        deadline_from_ts(ts)
+    cached_time = time.perf_counter() - start
+    print(f"\ndecode {len(deadlines):,} deadlines: fromtimestamp {uncached_time:.2f}s, "
+          f"deadline_from_ts {cached_time:.2f}s ({deadline_from_ts.cache_info().currsize} distinct)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from controllers.task_controller import TaskController
+from models.task_model import Task
+from utils.database import Database
+from utils.logging_config import configure_logging
+
+# Usage: python -m benchmarks.bench_engine [tasks] [ops]
+# Compares Database(engine='file') with Database(engine='memory') on copies of
+# the same database: opening it, the reads and writes the GUI makes, and for
+# the memory engine the cost of saving changes back to the file.
+
+WORDS = ['report', 'budget', 'review', 'email', 'meeting', 'invoice', 'draft', 'plan']
+PRIORITIES = ['High', 'Medium', 'Low']
+PAGE_ROWS = 50
+
+def build(path, count, rng):
+    start = datetime(2024, 1, 1, 9)
+    controller = TaskController(path)
+    controller.add_tasks(
+        {
+            'title': f"{' '.join(rng.choices(WORDS, k=2))} {rng.randint(1, 5000)}",
+            'description': ' '.join(rng.choices(WORDS, k=6)),
+            'deadline': start + timedelta(hours=rng.randrange(24 * 730)),
+            'priority': rng.choice(PRIORITIES)
+        }
+        for _ in range(count)
+    )
+    controller.close()
+
+def per_op(func, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    return (time.perf_counter() - start) / ops * 1000
+
+def run(path, engine, tasks, ops, rng):
+    results = {}
+    start = time.perf_counter()
+    db = Database(path, engine=engine, persist_interval=3600)
+    db.create_tasks_table()
+    results['open'] = (time.perf_counter() - start) * 1000
+    ids = [rng.randint(1, tasks) for _ in range(ops)]
+    offsets = [rng.randint(0, tasks - PAGE_ROWS) for _ in range(ops)]
+    day = datetime(2024, 6, 1)
+    results['get_task_by_id'] = per_op(lambda i: db.get_task_by_id(ids[i]), ops)
+    results['query_tasks page'] = per_op(
+        lambda i: db.query_tasks(status='Pending', order_by='deadline', limit=PAGE_ROWS, offset=offsets[i] // 4), ops
+    )
+    results['count_tasks'] = per_op(lambda i: db.count_tasks(status='Pending'), ops)
+    results['search_tasks'] = per_op(lambda i: db.search_tasks(f"{WORDS[i % len(WORDS)]} {ids[i] % 5000}", limit=20), ops)
+    results['get_tasks_due_between'] = per_op(
+        lambda i: db.get_tasks_due_between(day + timedelta(days=i % 30), day + timedelta(days=i % 30 + 7)), ops
+    )
+    results['update_task'] = per_op(lambda i: db.update_task(ids[i], {'priority': PRIORITIES[i % 3]}), ops)
+    task = Task(None, 'new task', 'benchmark', day, 'Low')
+    results['insert_task'] = per_op(lambda i: db.insert_task(task), ops)
+    results['persist'] = None
+    results['persist (lock held)'] = None
+    if engine == 'memory':
+        start = time.perf_counter()
+        db.persist()
+        results['persist'] = (time.perf_counter() - start) * 1000
+        results['persist (lock held)'] = db.connections.last_persist_lock_seconds * 1000
+    start = time.perf_counter()
+    db.close()
+    results['close'] = (time.perf_counter() - start) * 1000
+    return results
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    configure_logging(level='WARNING')
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source.db')
+        build(source, tasks, random.Random(42))
+        size_mb = os.path.getsize(source) / 2**20
+        results = {}
+        for engine in ('file', 'memory'):
+            path = os.path.join(tmp, f"{engine}.db")
+            shutil.copyfile(source, path)
+            results[engine] = run(path, engine, tasks, ops, random.Random(7))
+    print(f"{tasks:,} tasks ({size_mb:.1f} MB), {ops:,} ops per row; open, persist and close are totals")
+    print(f"{'ms':<24}{'file':>10}{'memory':>10}{'speedup':>10}")
+    for name in results['file']:
+        file_ms, memory_ms = results['file'][name], results['memory'][name]
+        if file_ms is None:
+            print(f"{name:<24}{'-':>10}{memory_ms:>10.3f}")
+        else:
+            print(f"{name:<24}{file_ms:>10.3f}{memory_ms:>10.3f}{file_ms / memory_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
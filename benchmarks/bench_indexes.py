@@ -0,0 +1,111 @@
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from utils.database import Database
+from utils.deadlines import day_range_ts, day_start_ts
+
+# Usage: python -m benchmarks.bench_indexes [rows ...]
+# Times the lookups the GUI and controller run against a table at schema
+# version 0 (no indexes, 'YYYY-MM-DD' text deadlines) and again after
+# migrating to the latest version (indexed epoch-second deadlines). The
+# priority and status filters match a third or more of the table, so no index
+# helps them: they are here to show the migrated schema doesn't slow them
+# down much, and a speedup below 1.0x is a slowdown.
+
+PRIORITIES = ['High', 'Medium', 'Low']
+
+def populate(db, rows, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    data = (
+        (
+            f"Task {i}",
+            f"Description for task {i}",
+            (start + timedelta(days=rng.randrange(730))).strftime('%Y-%m-%d'),
+            rng.choice(PRIORITIES),
+            'Completed' if rng.random() < 0.7 else 'Pending',
+        )
+        for i in range(rows)
+    )
+    with db.writing() as cursor:
+        cursor.executemany(
+            'INSERT INTO tasks (title, description, deadline, priority, status) VALUES (?, ?, ?, ?, ?)',
+            data
+        )
+
+def time_call(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_lookups(db, column, day, week):
+    # column is the deadline column; day and week are (start, end) bounds in
+    # its representation, so both schemas answer the same questions. Only the
+    # columns both schemas share are read, so the wider migrated rows don't
+    # count against the indexes.
+    columns = f"id, title, description, {column}, priority, status"
+    with db.reading() as cursor:
+        return {
+            'due on one day': time_call(
+                lambda: cursor.execute(f"SELECT {columns} FROM tasks WHERE {column} >= ? AND {column} < ?", day).fetchall()
+            ),
+            'Pending due within a week': time_call(
+                lambda: cursor.execute(
+                    f"SELECT {columns} FROM tasks WHERE status='Pending' AND {column} >= ? AND {column} < ? ORDER BY {column}",
+                    week
+                ).fetchall()
+            ),
+            'priority = High': time_call(
+                lambda: cursor.execute(f"SELECT {columns} FROM tasks WHERE priority='High'").fetchall()
+            ),
+            'status = Pending': time_call(
+                lambda: cursor.execute(f"SELECT {columns} FROM tasks WHERE status='Pending'").fetchall()
+            ),
+            'Pending by deadline (first 50)': time_call(
+                lambda: cursor.execute(
+                    f"SELECT {columns} FROM tasks WHERE status='Pending' ORDER BY {column} LIMIT 50"
+                ).fetchall()
+            ),
+        }
+
+def benchmark(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        db.create_tasks_table(target_version=0)
+        populate(db, rows)
+        day = date(2024, 6, 15)
+        week_end = day + timedelta(days=7)
+        before = run_lookups(
+            db, 'deadline',
+            (day.isoformat(), (day + timedelta(days=1)).isoformat()),
+            (day.isoformat(), week_end.isoformat())
+        )
+        start = time.perf_counter()
+        db.migrate()
+        migrate_time = time.perf_counter() - start
+        after = run_lookups(db, 'deadline_ts', day_range_ts(day), (day_start_ts(day), day_start_ts(week_end)))
+        db.close()
+    print(f"\n{rows:,} rows (migration took {migrate_time:.2f}s)")
+    print(f"{'lookup':<34}{'before (ms)':>12}{'after (ms)':>12}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<34}{before[name] * 1000:>12.2f}{after[name] * 1000:>12.2f}"
+              f"{before[name] / after[name]:>9.1f}x")
+
+def main():
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    print(f"SQLite {sqlite3.sqlite_version}")
+    for rows in sizes:
+        benchmark(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from models.task_model import Task
+from utils.database import Database
+from utils.logging_config import configure_logging, stop_logging
+
+# Usage: python -m benchmarks.bench_logging [tasks] [--stderr]
+# Insert and update throughput with data-layer logging off (WARNING), with
+# DEBUG records written synchronously, and with DEBUG records handed to the
+# background QueueListener. Log output goes to a temporary file, or to stderr
+# with --stderr, which shows the effect of a slow terminal or pipe.
+
+MODES = [
+    ('off (WARNING)', logging.WARNING, False),
+    ('DEBUG, synchronous', logging.DEBUG, False),
+    ('DEBUG, queue', logging.DEBUG, True),
+]
+
+def make_tasks(count):
+    deadline = datetime(2024, 6, 15)
+    return [Task(None, f"Task {i}", f"Description for task {i}", deadline, 'Medium') for i in range(count)]
+
+def run(db, tasks):
+    # Per-row writes log one record each; the batch insert logs one in total
+    start = time.perf_counter()
+    task_ids = [db.insert_task(task) for task in tasks]
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    for task_id in task_ids:
+        db.update_task(task_id, {'priority': 'High', 'status': 'Pending'})
+    update = time.perf_counter() - start
+    start = time.perf_counter()
+    db.insert_tasks(tasks)
+    batch = time.perf_counter() - start
+    return single, update, batch
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--stderr']
+    to_stderr = '--stderr' in sys.argv
+    count = int(args[0]) if args else 2000
+    tasks = make_tasks(count)
+    print(f"{count:,} tasks per run, logging to {'stderr' if to_stderr else 'a file'}")
+    print(f"{'logging':<22}{'insert_task/s':>15}{'update_task/s':>15}{'insert_tasks/s':>16}{'flush (ms)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, level, use_queue in MODES:
+            # Faster commits so the logging cost is not hidden behind fsync
+            db = Database(os.path.join(tmp, f"{name.split()[0]}-{use_queue}.db"), synchronous='OFF')
+            db.create_tasks_table()
+            log_file = None if to_stderr else os.path.join(tmp, 'bench.log')
+            configure_logging(level=level, use_queue=use_queue, filename=log_file)
+            single, update, batch = run(db, tasks)
+            start = time.perf_counter()
+            stop_logging()
+            flush = time.perf_counter() - start
+            db.close()
+            print(f"{name:<22}{count / single:>15,.0f}{count / update:>15,.0f}{count / batch:>16,.0f}{flush * 1000:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_tk import FakeTreeview, FakeWidget
+from controllers.task_controller import TaskController
+from utils.deadlines import format_deadline
+from utils.logging_config import configure_logging
+from views.refresh_scheduler import RefreshScheduler
+from views.tree_sync import TreeReconciler
+
+# Usage: python -m benchmarks.bench_refresh [tasks] [writes]
+# A burst of single-task edits, each followed by a request to refresh the
+# pending list, as when the change feed or a run of quick edits reports many
+# writes in a row. Compares refreshing on every request with merging the
+# requests through RefreshScheduler. Uses a stub widget and Treeview, so it
+# measures the database and reconcile work without a display.
+
+PRIORITIES = ['High', 'Medium', 'Low']
+WINDOW_ROWS = 40
+
+def row_values(task):
+    return (task.id, task.title, task.description, format_deadline(task.deadline), task.priority)
+
+def make_refresh(controller):
+    # What VirtualTreeview.refresh does: re-read the count and the window,
+    # then reconcile the Treeview
+    reconciler = TreeReconciler(FakeTreeview())
+    
+    def refresh():
+        controller.count_tasks(status='Pending')
+        window = controller.query_tasks(status='Pending', order_by='priority', limit=WINDOW_ROWS)
+        reconciler.sync([(task.id, row_values(task)) for task in window])
+    
+    return refresh
+
+def run(controller, writes, rng, scheduled):
+    refresh = make_refresh(controller)
+    widget = FakeWidget()
+    scheduler = RefreshScheduler(widget)
+    request = (lambda: scheduler.request(refresh)) if scheduled else refresh
+    requested = [0]
+    
+    def counted():
+        requested[0] += 1
+        request()
+    
+    start = time.perf_counter()
+    for _ in range(writes):
+        controller.edit_task(rng.randint(1, 1000), {'priority': rng.choice(PRIORITIES)})
+        counted()
+        # The event loop gets a turn between writes
+        widget.update()
+    while widget.jobs:
+        time.sleep(max(0.0, widget.next_due() - time.monotonic()))
+        widget.update()
+    elapsed = time.perf_counter() - start
+    redraws = scheduler.stats()['performed'] if scheduled else requested[0]
+    return elapsed, requested[0], redraws
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    configure_logging(level='WARNING')
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = TaskController(os.path.join(tmp, 'bench.db'))
+        controller.add_tasks(
+            {'title': f"Task {i}", 'description': '', 'deadline': None, 'priority': rng.choice(PRIORITIES)}
+            for i in range(tasks)
+        )
+        print(f"{tasks:,} tasks, {writes} writes")
+        print(f"{'mode':<28}{'total (s)':>10}{'requests':>10}{'redraws':>10}")
+        for name, scheduled in [('refresh on every write', False), ('RefreshScheduler', True)]:
+            elapsed, requested, redraws = run(controller, writes, rng, scheduled)
+            print(f"{name:<28}{elapsed:>10.2f}{requested:>10}{redraws:>10}")
+        controller.close()
+
+if __name__ == "__main__":
+    main()
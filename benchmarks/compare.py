@@ -0,0 +1,33 @@
+import json
+import sys
+
+# Usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json
+# Compares two benchmarks.suite result files benchmark by benchmark, using
+# the median time per operation. Ratios above 1 mean the candidate is slower.
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    results = {(r['size'], r['group'], r['name']): r for r in report['results']}
+    return report['meta'], results
+
+def main():
+    if len(sys.argv) != 3:
+        print("usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json")
+        sys.exit(2)
+    base_meta, base = load(sys.argv[1])
+    new_meta, new = load(sys.argv[2])
+    print(f"baseline  {base_meta.get('commit')} ({base_meta.get('timestamp')}, tk: {base_meta.get('tk')})")
+    print(f"candidate {new_meta.get('commit')} ({new_meta.get('timestamp')}, tk: {new_meta.get('tk')})")
+    print(f"\n{'size':>10}  {'benchmark':<48}{'baseline':>12}{'candidate':>12}{'ratio':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        size, group, name = key
+        before = base[key]['median_ms']
+        after = new[key]['median_ms']
+        ratio = after / before if before else float('inf')
+        print(f"{size:>10,}  {group + ': ' + name:<48}{before:>12.4f}{after:>12.4f}{ratio:>7.2f}x")
+    for key in sorted(base.keys() ^ new.keys()):
+        print(f"only in {'baseline' if key in base else 'candidate'}: {key[0]:,} {key[1]}: {key[2]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import time
+
+class FakeTreeview:
+    # Stand-in for ttk.Treeview with the calls TreeReconciler and the eager
+    # population loop make, for machines without a display. It keeps the same
+    # bookkeeping a Treeview does (an ordered child list and values per item)
+    # but draws nothing, so it measures our side of the work only.
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.next_id = 0
+    
+    def insert(self, parent, index, iid=None, values=()):
+        if iid is None:
+            self.next_id += 1
+            iid = f'I{self.next_id:03X}'
+        self.values[iid] = tuple(values)
+        if index == 'end':
+            self.children.append(iid)
+        else:
+            self.children.insert(index, iid)
+        return iid
+    
+    def item(self, iid, values=None):
+        if values is None:
+            return {'values': list(self.values[iid])}
+        self.values[iid] = tuple(values)
+    
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+    
+    def delete(self, *iids):
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+    
+    def get_children(self, item=''):
+        return tuple(self.children)
+    
+    def destroy(self):
+        self.children = []
+        self.values = {}
+
+class FakeWidget:
+    # Stand-in for the after() family of a Tk widget. Callbacks run from
+    # update() once their time has come, as the Tk event loop would run them.
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+    
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        job = f'after#{self.next_id}'
+        self.jobs[job] = (time.monotonic() + ms / 1000, func, args)
+        return job
+    
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+    
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+    
+    def update(self):
+        now = time.monotonic()
+        due = sorted((entry[0], job) for job, entry in self.jobs.items() if entry[0] <= now)
+        for when, job in due:
+            entry = self.jobs.pop(job, None)
+            if entry is not None:
+                entry[1](*entry[2])
+    
+    def next_due(self):
+        return min((entry[0] for entry in self.jobs.values()), default=None)
@@ -0,0 +1,329 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.fake_tk import FakeTreeview
+from controllers.task_controller import TaskController
+from models.task_model import Task
+from utils.database import Database, MIGRATIONS
+from utils.deadlines import format_deadline
+from utils.logging_config import configure_logging
+from utils.notifications import NotificationManager
+from views.tree_sync import TreeReconciler
+
+logger = logging.getLogger(__name__)
+
+# Usage: python -m benchmarks.suite [--sizes 1000 10000 ...] [--output FILE] [--stub-tk]
+# Times the database, controller, notifier and view layers against seeded
+# synthetic datasets and writes the results as JSON, which
+# benchmarks.compare can diff across commits. Datasets are built once per
+# size, seed and day and cached in the system temp directory.
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SEED = 42
+
+# Dataset mix: a third of tasks still pending, most tasks Medium, one in ten
+# without a deadline, deadlines from three months ago to six months ahead
+PENDING_SHARE = 0.35
+PRIORITY_WEIGHTS = {'High': 0.2, 'Medium': 0.45, 'Low': 0.35}
+NO_DEADLINE_SHARE = 0.1
+DEADLINE_DAYS = (-90, 180)
+
+VERBS = ['Write', 'Review', 'Update', 'Fix', 'Plan', 'Call', 'Email', 'Prepare', 'Book', 'Clean']
+NOUNS = ['report', 'budget', 'slides', 'invoice', 'meeting', 'garden', 'car', 'taxes', 'trip', 'kitchen']
+WORDS = VERBS + NOUNS + ['for', 'with', 'before', 'after', 'team', 'client', 'weekly', 'draft', 'notes', 'plan']
+
+# Each measurement repeats until it has run for TIME_BUDGET seconds, at least
+# once and at most MAX_REPEAT times
+TIME_BUDGET = 2.0
+MAX_REPEAT = 20
+# Rows per single-row CRUD measurement, lookups per lookup measurement
+CRUD_OPS = 100
+LOOKUP_OPS = 1000
+# Visible rows of a virtual list and scroll steps per measurement
+WINDOW_ROWS = 50
+SCROLL_STEPS = 20
+# Eager population of every pending row is skipped above this many rows
+EAGER_LIMIT = 100_000
+
+def generate_rows(rows, seed, today):
+    rng = random.Random(seed)
+    priorities = list(PRIORITY_WEIGHTS)
+    weights = list(PRIORITY_WEIGHTS.values())
+    for i in range(rows):
+        if rng.random() < NO_DEADLINE_SHARE:
+            deadline = None
+        else:
+            deadline = (today + timedelta(days=rng.randint(*DEADLINE_DAYS))).strftime('%Y-%m-%d')
+        yield (
+            f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {i}",
+            ' '.join(rng.choices(WORDS, k=rng.randint(3, 12))),
+            deadline,
+            rng.choices(priorities, weights)[0],
+            'Pending' if rng.random() < PENDING_SHARE else 'Completed',
+        )
+
+def build_dataset(path, rows, seed, today):
+    db = Database(path)
+    db.create_tasks_table(target_version=0)
+    with db.writing() as cursor:
+        cursor.executemany(
+            'INSERT INTO tasks (title, description, deadline, priority, status) VALUES (?, ?, ?, ?, ?)',
+            generate_rows(rows, seed, today)
+        )
+    # Indexes and the search index are built in one pass over the full table
+    db.migrate()
+    db.close()
+
+def dataset(cache_dir, rows, seed, today):
+    version = MIGRATIONS[-1][0]
+    path = os.path.join(cache_dir, f"tasks-{rows}-{seed}-{today:%Y%m%d}-v{version}.db")
+    if not os.path.exists(path):
+        print(f"Building {rows:,} task dataset...", flush=True)
+        if os.path.exists(path + '.tmp'):
+            os.remove(path + '.tmp')
+        build_dataset(path + '.tmp', rows, seed, today)
+        os.replace(path + '.tmp', path)
+    return path
+
+def measure(func, setup=None, ops=1):
+    # Returns milliseconds per operation; setup runs untimed before each repeat
+    samples = []
+    spent = 0.0
+    while len(samples) < MAX_REPEAT and (not samples or spent < TIME_BUDGET):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        spent += elapsed
+        samples.append(elapsed / ops)
+    return {
+        'ops': ops,
+        'repeat': len(samples),
+        'best_ms': min(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000
+    }
+
+def make_tree_factory(stub):
+    # A Treeview on a hidden Tk root when a display is available, otherwise
+    # FakeTreeview
+    if not stub:
+        try:
+            import tkinter as tk
+            from tkinter import ttk
+            root = tk.Tk()
+            root.withdraw()
+            columns = ('ID', 'Title', 'Description', 'Deadline', 'Priority')
+            return 'tk', lambda: ttk.Treeview(root, columns=columns, show='headings')
+        except Exception as e:
+            logger.warning("No Tk display (%s); timing views with a stub Treeview", e)
+    return 'stub', FakeTreeview
+
+def row_values(task):
+    return (task.id, task.title, task.description, format_deadline(task.deadline), task.priority)
+
+def sample_task(rng, today):
+    return Task(
+        id=None,
+        title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+        description=' '.join(rng.choices(WORDS, k=6)),
+        deadline=datetime.combine(today + timedelta(days=rng.randint(*DEADLINE_DAYS)), datetime.min.time()),
+        priority=rng.choice(list(PRIORITY_WEIGHTS))
+    )
+
+def max_task_id(db):
+    with db.reading() as cursor:
+        return cursor.execute('SELECT MAX(id) FROM tasks').fetchone()[0]
+
+def bench_database(db, rng, today):
+    max_id = max_task_id(db)
+    lookup_ids = [rng.randint(1, max_id) for _ in range(LOOKUP_OPS)]
+    tasks = [sample_task(rng, today) for _ in range(CRUD_OPS)]
+    batch = [sample_task(rng, today) for _ in range(1000)]
+    created = []
+    to_delete = []
+    
+    def insert_each():
+        created.extend(db.insert_task(task) for task in tasks)
+    
+    def update_each():
+        for task_id in created[-CRUD_OPS:]:
+            db.update_task(task_id, {'priority': rng.choice(list(PRIORITY_WEIGHTS))})
+    
+    def insert_to_delete():
+        to_delete[:] = [db.insert_task(task) for task in tasks]
+    
+    def delete_each():
+        for task_id in to_delete:
+            db.delete_task(task_id)
+    
+    def insert_batch_to_delete():
+        to_delete[:] = db.insert_tasks(batch)
+    
+    yield 'insert_task', measure(insert_each, ops=CRUD_OPS)
+    yield 'update_task', measure(update_each, ops=CRUD_OPS)
+    yield 'delete_task', measure(delete_each, setup=insert_to_delete, ops=CRUD_OPS)
+    yield 'insert_tasks (1000)', measure(lambda: created.extend(db.insert_tasks(batch)), ops=len(batch))
+    yield 'delete_tasks (1000)', measure(lambda: db.delete_tasks(to_delete), setup=insert_batch_to_delete, ops=len(batch))
+    # Reads run against the original dataset
+    db.delete_tasks(created)
+    yield 'get_task_by_id', measure(lambda: [db.get_task_by_id(task_id) for task_id in lookup_ids], ops=LOOKUP_OPS)
+    yield 'get_all_tasks', measure(db.get_all_tasks)
+    yield 'get_all_tasks (batch)', measure(lambda: db.get_all_tasks(as_batch=True))
+    yield 'count_tasks (Pending)', measure(lambda: db.count_tasks(status='Pending'))
+    yield 'query_tasks (first page)', measure(
+        lambda: db.query_tasks(status='Pending', order_by='deadline', limit=WINDOW_ROWS)
+    )
+    yield 'query_tasks (middle page)', measure(
+        lambda: db.query_tasks(status='Pending', order_by='deadline', limit=WINDOW_ROWS, offset=max_id // 6)
+    )
+    yield 'search_tasks', measure(lambda: db.search_tasks('rep bud', limit=WINDOW_ROWS))
+    week_start = datetime.combine(today, datetime.min.time())
+    yield 'get_tasks_due_between (1 week)', measure(
+        lambda: db.get_tasks_due_between(week_start, week_start + timedelta(days=7), status='Pending')
+    )
+
+def bench_controller(controller, rng):
+    max_id = max_task_id(controller.db)
+    lookup_ids = [rng.randint(1, max_id) for _ in range(LOOKUP_OPS)]
+    
+    # Distinct ids, so no cold lookup is served by an earlier one in the
+    # same pass
+    cold_ids = rng.sample(range(1, max_id + 1), min(LOOKUP_OPS, max_id))
+    
+    def lookups(task_ids):
+        for task_id in task_ids:
+            controller.get_task_by_id(task_id)
+    
+    def clear_caches():
+        controller._forget_all_tasks()
+        controller.result_cache.clear()
+    
+    yield 'get_task_by_id (cold)', measure(lambda: lookups(cold_ids), setup=clear_caches, ops=len(cold_ids))
+    yield 'get_task_by_id (cached)', measure(lambda: lookups(lookup_ids), ops=LOOKUP_OPS)
+    yield 'get_all_tasks', measure(controller.get_all_tasks, setup=controller.result_cache.clear)
+    yield 'get_all_tasks (cached)', measure(controller.get_all_tasks)
+    yield 'get_tasks_by_priority (cached)', measure(lambda: controller.get_tasks_by_priority('High'))
+    yield 'get_stats (reload)', measure(controller.get_stats, setup=controller.stats.invalidate)
+    yield 'get_stats (cached)', measure(controller.get_stats)
+
+def bench_notifier(controller, rng):
+    manager = NotificationManager(controller)
+    # notify() prints; the benchmark only times the bookkeeping
+    manager.notify = lambda task: None
+    change_feed = controller.create_change_feed()
+    change_feed.subscribe(manager.on_external_changes)
+    max_id = max_task_id(controller.db)
+    dirty_ids = [rng.randint(1, max_id) for _ in range(LOOKUP_OPS)]
+    
+    def mark_dirty():
+        controller._forget_all_tasks()
+        manager.on_task_changed('update', dirty_ids)
+    
+    yield 'load_pending_tasks', measure(manager.load_pending_tasks)
+    yield 'run_cycle (idle)', measure(lambda: manager.run_cycle(change_feed))
+    yield 'run_cycle (1000 changed)', measure(lambda: manager.run_cycle(change_feed), setup=mark_dirty, ops=len(dirty_ids))
+    controller.remove_listener(manager.on_task_changed)
+
+def bench_views(controller, rng, new_tree, rows):
+    pending = controller.count_tasks(status='Pending')
+    trees = []
+    
+    def scroll():
+        tree = new_tree()
+        trees.append(tree)
+        reconciler = TreeReconciler(tree)
+        offset = rng.randint(0, max(0, pending - WINDOW_ROWS))
+        for _ in range(SCROLL_STEPS):
+            window = controller.query_tasks(status='Pending', order_by='deadline', limit=WINDOW_ROWS, offset=offset)
+            reconciler.sync([(task.id, row_values(task)) for task in window])
+            offset = min(offset + 3, max(0, pending - WINDOW_ROWS))
+    
+    def populate_all():
+        tree = new_tree()
+        trees.append(tree)
+        for task in controller.query_tasks(status='Pending', order_by='deadline'):
+            tree.insert('', 'end', values=row_values(task))
+    
+    yield 'virtual list scroll step', measure(scroll, ops=SCROLL_STEPS)
+    if rows <= EAGER_LIMIT:
+        yield 'populate every pending row', measure(populate_all)
+    for tree in trees:
+        tree.destroy()
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout
+        return commit + ('-dirty' if dirty.strip() else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, seed, cache_dir, stub_tk):
+    today = date.today()
+    tk_mode, new_tree = make_tree_factory(stub_tk)
+    results = []
+    for rows in sizes:
+        source = dataset(cache_dir, rows, seed, today)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            shutil.copyfile(source, path)
+            rng = random.Random(seed)
+            db = Database(path)
+            controller = TaskController(path)
+            groups = [
+                ('database', bench_database(db, rng, today)),
+                ('controller', bench_controller(controller, rng)),
+                ('notifier', bench_notifier(controller, rng)),
+                ('views', bench_views(controller, rng, new_tree, rows)),
+            ]
+            print(f"\n{rows:,} tasks")
+            print(f"{'benchmark':<48}{'median (ms/op)':>16}{'best (ms/op)':>14}{'runs':>6}")
+            for group, benchmarks in groups:
+                for name, result in benchmarks:
+                    results.append({'size': rows, 'group': group, 'name': name, **result})
+                    print(f"{group + ': ' + name:<48}{result['median_ms']:>16.4f}{result['best_ms']:>14.4f}{result['repeat']:>6}", flush=True)
+            db.close()
+            controller.close()
+    meta = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'tk': tk_mode
+    }
+    return {'meta': meta, 'results': results}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the task manager's layers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', default='bench_results.json', help="JSON results file (default: %(default)s)")
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'task-manager-bench'))
+    parser.add_argument('--stub-tk', action='store_true', help="time views with a stub Treeview even if Tk is available")
+    args = parser.parse_args(argv)
+    configure_logging(level=logging.WARNING)
+    os.makedirs(args.cache_dir, exist_ok=True)
+    
+    report = run(args.sizes, args.seed, args.cache_dir, args.stub_tk)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import logging
+import sys
+
+# Command-line interface for scripts and cron jobs. It never imports tkinter,
+# and the controller and database layers are only imported once a command
+# actually needs them, so `--help` and argument errors return immediately.
+#
+#   python cli.py add "Write report" --deadline "2024-12-31 17:00" --priority High
+#   python cli.py list --sort deadline
+#   python cli.py complete 12 13
+#   python cli.py query --text report --status all
+#   python cli.py stats
+
+PRIORITIES = ['High', 'Medium', 'Low']
+STATUSES = {'pending': 'Pending', 'completed': 'Completed', 'all': None}
+
+def parse_date(text):
+    from datetime import datetime
+    try:
+        return datetime.strptime(text, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {text!r}, expected YYYY-MM-DD")
+
+def parse_deadline(text):
+    from utils.deadlines import INPUT_HINT, parse_deadline_text
+    try:
+        return parse_deadline_text(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid deadline {text!r}, expected {INPUT_HINT}")
+
+def open_controller(args):
+    from controllers.task_controller import TaskController
+    controller = args.controller = TaskController(args.db)
+    if args.profile:
+        args.query_stats = controller.db.enable_instrumentation(slow_threshold_ms=args.slow_ms)
+    return controller
+
+def task_record(task):
+    from utils.deadlines import format_deadline
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'deadline': format_deadline(task.deadline, None),
+        'priority': task.priority,
+        'status': task.status,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None
+    }
+
+def print_tasks(tasks, as_json):
+    if as_json:
+        import json
+        for task in tasks:
+            print(json.dumps(task_record(task)))
+        return
+    from utils.deadlines import format_deadline
+    for task in tasks:
+        deadline = format_deadline(task.deadline, '-')
+        print(f"{task.id}\t{task.status}\t{task.priority}\t{deadline}\t{task.title}")
+
+def cmd_add(args):
+    controller = open_controller(args)
+    task_id = controller.add_task({
+        'title': args.title,
+        'description': args.description,
+        'deadline': args.deadline,
+        'priority': args.priority
+    })
+    if task_id is None:
+        return 1
+    print(task_id)
+    return 0
+
+def cmd_list(args):
+    controller = open_controller(args)
+    if args.status == 'archived':
+        tasks = controller.get_archived_tasks(limit=args.limit)
+    else:
+        tasks = controller.iter_tasks(status=STATUSES[args.status], order_by=args.sort, limit=args.limit)
+    print_tasks(tasks, args.json)
+    return 0
+
+def cmd_query(args):
+    controller = open_controller(args)
+    status = STATUSES[args.status]
+    if args.text:
+        tasks = controller.search_tasks(
+            args.text,
+            limit=args.limit or 50,
+            status=status,
+            priority=args.priority,
+            due_before=args.due_before
+        )
+    else:
+        tasks = controller.iter_tasks(
+            status=status,
+            priority=args.priority,
+            due_before=args.due_before,
+            order_by=args.sort,
+            limit=args.limit
+        )
+    print_tasks(tasks, args.json)
+    return 0
+
+def cmd_complete(args):
+    controller = open_controller(args)
+    updated = controller.mark_tasks_complete(args.ids)
+    print(f"Completed {updated} of {len(args.ids)} tasks")
+    return 0 if updated == len(args.ids) else 1
+
+def cmd_delete(args):
+    controller = open_controller(args)
+    deleted = controller.delete_tasks(args.ids)
+    print(f"Deleted {deleted} of {len(args.ids)} tasks")
+    return 0 if deleted == len(args.ids) else 1
+
+def cmd_archive(args):
+    from datetime import timedelta
+    controller = open_controller(args)
+    archived = controller.archive_completed_tasks(older_than=timedelta(days=args.days))
+    print(f"Archived {archived} tasks")
+    return 0
+
+def cmd_stats(args):
+    controller = open_controller(args)
+    stats = controller.get_stats()
+    if args.json:
+        import json
+        print(json.dumps(stats))
+        return 0
+    for section, counts in stats.items():
+        print(section)
+        for key, count in counts.items():
+            print(f"  {key}\t{count}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='task-manager-cli', description="Manage tasks from the command line.")
+    parser.add_argument('--db', default='utils/tasks.db', help="database file (default: %(default)s)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log database activity to stderr")
+    parser.add_argument('--profile', action='store_true', help="print per-statement query stats to stderr")
+    parser.add_argument('--slow-ms', type=float, default=100, help="slow query threshold for --profile (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    add = commands.add_parser('add', help="add a task and print its id")
+    add.add_argument('title')
+    add.add_argument('-d', '--description', default='')
+    add.add_argument('--deadline', type=parse_deadline, help="YYYY-MM-DD (end of that day) or YYYY-MM-DD HH:MM")
+    add.add_argument('--priority', choices=PRIORITIES, default='Low')
+    add.set_defaults(func=cmd_add)
+    
+    listing = commands.add_parser('list', help="list tasks")
+    listing.add_argument('--status', choices=[*STATUSES, 'archived'], default='pending')
+    listing.add_argument('--sort', choices=['id', 'deadline', 'priority'], default='id')
+    listing.add_argument('--limit', type=int)
+    listing.add_argument('--json', action='store_true', help="print one JSON object per task")
+    listing.set_defaults(func=cmd_list)
+    
+    query = commands.add_parser('query', help="filter tasks or search their text")
+    query.add_argument('--text', help="full-text search; results are ranked by relevance")
+    query.add_argument('--status', choices=STATUSES, default='pending')
+    query.add_argument('--priority', choices=PRIORITIES)
+    query.add_argument('--due-before', type=parse_date, help="YYYY-MM-DD")
+    query.add_argument('--sort', choices=['id', 'deadline', 'priority'], default='id')
+    query.add_argument('--limit', type=int)
+    query.add_argument('--json', action='store_true', help="print one JSON object per task")
+    query.set_defaults(func=cmd_query)
+    
+    complete = commands.add_parser('complete', help="mark tasks complete")
+    complete.add_argument('ids', nargs='+', type=int)
+    complete.set_defaults(func=cmd_complete)
+    
+    delete = commands.add_parser('delete', help="delete tasks")
+    delete.add_argument('ids', nargs='+', type=int)
+    delete.set_defaults(func=cmd_delete)
+    
+    archive = commands.add_parser('archive', help="move old completed tasks to the archive")
+    archive.add_argument('--days', type=float, default=30, help="archive tasks completed more than this many days ago (default: %(default)s)")
+    archive.set_defaults(func=cmd_archive)
+    
+    stats = commands.add_parser('stats', help="count tasks by priority, status and deadline")
+    stats.add_argument('--json', action='store_true')
+    stats.set_defaults(func=cmd_stats)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from utils.logging_config import configure_logging
+    configure_logging(level=logging.DEBUG if args.verbose else logging.WARNING)
+    status = args.func(args)
+    if getattr(args, 'controller', None) is not None:
+        args.controller.close()
+    if getattr(args, 'query_stats', None) is not None:
+        from utils.query_stats import format_query_stats
+        print(format_query_stats(args.query_stats.snapshot()), file=sys.stderr)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
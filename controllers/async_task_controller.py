@@ -0,0 +1,210 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from controllers.task_controller import ARCHIVE_AFTER, ARCHIVE_BATCH_SIZE, TaskController
+
+# Tasks per query when iterating with iter_tasks
+PAGE_SIZE = 500
+
+class AsyncTaskController:
+    # TaskController for asyncio code. Each method runs the matching
+    # TaskController call on a thread and awaits it. Writes run one at a time
+    # on a single thread, in the order they were awaited; reads run side by
+    # side on up to one thread per read connection. A read started after a
+    # write has finished sees that write.
+    #
+    # Cancelling a call that has not started yet means it never runs, so a
+    # cancelled write that was still queued is not applied. A call that is
+    # already running finishes and its result is dropped.
+    def __init__(self, db_path='utils/tasks.db', controller=None, read_workers=None):
+        self.controller = controller or TaskController(db_path)
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='task-write')
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=read_workers or max(self.controller.db.connections.pool_size, 1),
+            thread_name_prefix='task-read'
+        )
+        self._listeners = {}
+    
+    @classmethod
+    async def open(cls, db_path='utils/tasks.db', read_workers=None):
+        # Like the constructor, but opens and migrates the database without
+        # blocking the event loop
+        loop = asyncio.get_running_loop()
+        controller = await loop.run_in_executor(None, TaskController, db_path)
+        return cls(controller=controller, read_workers=read_workers)
+    
+    async def close(self):
+        # Waits for queued writes, then closes the database
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.write_executor.shutdown)
+        await loop.run_in_executor(None, self.read_executor.shutdown)
+        self.controller.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def _run(self, executor, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    
+    def _read(self, func, *args, **kwargs):
+        return self._run(self.read_executor, func, *args, **kwargs)
+    
+    def _write(self, func, *args, **kwargs):
+        return self._run(self.write_executor, func, *args, **kwargs)
+    
+    def _on_loop(self, callback):
+        # Wraps a callback made on a worker thread so it runs on the event loop
+        if callback is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return lambda *args: loop.call_soon_threadsafe(callback, *args)
+    
+    def add_listener(self, listener):
+        # Call from the event loop; listener(op, task_ids) is then called on
+        # that loop after every write
+        wrapper = self._on_loop(listener)
+        self._listeners[listener] = wrapper
+        self.controller.add_listener(wrapper)
+    
+    def remove_listener(self, listener):
+        wrapper = self._listeners.pop(listener, None)
+        if wrapper is not None:
+            self.controller.remove_listener(wrapper)
+    
+    async def create_change_feed(self):
+        return await self._read(self.controller.create_change_feed)
+    
+    async def poll_changes(self, change_feed):
+        return await self._read(change_feed.poll)
+    
+    async def add_task(self, task_data):
+        return await self._write(self.controller.add_task, task_data)
+    
+    async def edit_task(self, task_id, updated_data):
+        return await self._write(self.controller.edit_task, task_id, updated_data)
+    
+    async def delete_task(self, task_id):
+        return await self._write(self.controller.delete_task, task_id)
+    
+    async def mark_task_complete(self, task_id):
+        return await self._write(self.controller.mark_task_complete, task_id)
+    
+    async def add_tasks(self, tasks_data):
+        return await self._write(self.controller.add_tasks, tasks_data)
+    
+    async def edit_tasks(self, updates):
+        return await self._write(self.controller.edit_tasks, updates)
+    
+    async def delete_tasks(self, task_ids):
+        return await self._write(self.controller.delete_tasks, task_ids)
+    
+    async def mark_tasks_complete(self, task_ids):
+        return await self._write(self.controller.mark_tasks_complete, task_ids)
+    
+    async def clear_all_tasks(self):
+        return await self._write(self.controller.clear_all_tasks)
+    
+    async def export_tasks(self, path, fmt=None, progress=None):
+        return await self._read(self.controller.export_tasks, path, fmt, self._on_loop(progress))
+    
+    async def import_tasks(self, path, fmt=None, progress=None):
+        return await self._write(self.controller.import_tasks, path, fmt, self._on_loop(progress))
+    
+    async def archive_completed_tasks(self, older_than=ARCHIVE_AFTER, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None):
+        return await self._write(
+            self.controller.archive_completed_tasks,
+            older_than=older_than,
+            batch_size=batch_size,
+            max_batches=max_batches
+        )
+    
+    async def count_archived_tasks(self):
+        return await self._read(self.controller.count_archived_tasks)
+    
+    async def get_archived_tasks(self, limit=None, offset=None):
+        return await self._read(self.controller.get_archived_tasks, limit=limit, offset=offset)
+    
+    async def get_tasks_by_date(self, date, as_batch=False):
+        return await self._read(self.controller.get_tasks_by_date, date, as_batch)
+    
+    async def get_tasks_due_between(self, start=None, end=None, status=None, as_batch=False, use_cache=True):
+        return await self._read(self.controller.get_tasks_due_between, start, end, status, as_batch, use_cache)
+    
+    async def get_tasks_by_priority(self, priority, as_batch=False):
+        return await self._read(self.controller.get_tasks_by_priority, priority, as_batch)
+    
+    async def get_all_tasks(self, as_batch=False):
+        return await self._read(self.controller.get_all_tasks, as_batch)
+    
+    async def query_tasks(self, status=None, priority=None, due_before=None, order_by='id', limit=None, after_key=None, offset=None, as_batch=False, use_cache=True, before_key=None):
+        return await self._read(
+            self.controller.query_tasks,
+            status=status,
+            priority=priority,
+            due_before=due_before,
+            order_by=order_by,
+            limit=limit,
+            after_key=after_key,
+            offset=offset,
+            as_batch=as_batch,
+            use_cache=use_cache,
+            before_key=before_key
+        )
+    
+    async def iter_tasks(self, status=None, priority=None, due_before=None, order_by='id', page_size=PAGE_SIZE):
+        # Yields every matching task, fetching page_size at a time with
+        # keyset pagination. No connection is held between pages, so a slow
+        # consumer does not tie up the pool, and cancelling the consumer
+        # stops after the current page. Pages are never asked for again, so
+        # they skip the result cache.
+        after_key = None
+        while True:
+            page = await self.query_tasks(
+                status=status,
+                priority=priority,
+                due_before=due_before,
+                order_by=order_by,
+                limit=page_size,
+                after_key=after_key,
+                use_cache=False
+            )
+            for task in page:
+                yield task
+            if len(page) < page_size:
+                break
+            after_key = self.controller.page_key(page[-1], order_by)
+    
+    async def search_tasks(self, query, limit=50, offset=0, status=None, priority=None, due_before=None, as_batch=False):
+        return await self._read(
+            self.controller.search_tasks,
+            query,
+            limit=limit,
+            offset=offset,
+            status=status,
+            priority=priority,
+            due_before=due_before,
+            as_batch=as_batch
+        )
+    
+    async def count_tasks(self, status=None, priority=None, due_before=None):
+        return await self._read(self.controller.count_tasks, status=status, priority=priority, due_before=due_before)
+    
+    def page_key(self, task, order_by='id'):
+        return self.controller.page_key(task, order_by)
+    
+    async def get_task_by_id(self, task_id):
+        return await self._read(self.controller.get_task_by_id, task_id)
+    
+    def get_cache_stats(self):
+        return self.controller.get_cache_stats()
+    
+    async def get_stats(self, today=None):
+        return await self._read(self.controller.get_stats, today)
+    
+    @property
+    def stats_version(self):
+        return self.controller.stats_version
@@ -1,49 +1,406 @@
+import sqlite3
+import threading
+from collections import OrderedDict
 from models.task_model import Task
-from utils.database import Database
-from datetime import datetime
+from utils.database import Database, ChangeFeed
+from utils.deadlines import day_start_ts, parse_bound_text, parse_deadline_text
+from utils.result_cache import ResultCache
+from utils.stats import TaskStats
+from utils.transfer import CHUNK_SIZE, chunked, read_tasks, write_tasks
+from datetime import date, datetime, timedelta
+
+# Completed tasks older than this are moved to the archive
+ARCHIVE_AFTER = timedelta(days=30)
+# Tasks moved per archive transaction
+ARCHIVE_BATCH_SIZE = 500
+# Most tasks kept in the identity map; the least recently used go first
+TASK_CACHE_SIZE = 10_000
 
 class TaskController:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db_path='utils/tasks.db', result_cache=True, engine='file', task_cache_size=TASK_CACHE_SIZE):
+        # engine='memory' serves the database from memory, see Database
+        self.db = Database(db_path, engine=engine)
         self.db.create_tasks_table()
+        self.listeners = []
+        # Identity map of tasks already loaded by id, filled lazily by
+        # get_task_by_id and kept current by this controller's own writes.
+        # Every invalidation starts a new generation, and a lookup only fills
+        # the map if no invalidation ran while it read the row.
+        self._task_cache = OrderedDict()
+        self.task_cache_size = task_cache_size
+        self._task_generation = 0
+        self._task_cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Results of the list and count queries, dropped as a whole by the
+        # next write (see _notify) or change from another connection
+        self.result_cache = ResultCache(enabled=result_cache)
+        # Counts for the stats panel, loaded on first use and then adjusted
+        # by each single-task write
+        self.stats = TaskStats()
+        self._stats_lock = threading.Lock()
     
-    def add_task(self, task_data):
-        task = Task(
+    def add_listener(self, listener):
+        # Listeners are called as listener(op, task_ids) after every write,
+        # where op is one of 'insert', 'update', 'delete' or 'clear'
+        self.listeners.append(listener)
+    
+    def close(self):
+        # Closes the database connections; call once nothing uses the
+        # controller any more
+        self.db.close()
+    
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def _notify(self, op, task_ids):
+        # Every write ends here once it has committed
+        self.result_cache.bump()
+        for listener in list(self.listeners):
+            listener(op, task_ids)
+    
+    def create_change_feed(self):
+        # Each consumer polls its own feed from its own thread. Changes seen
+        # by any feed also invalidate the task cache.
+        feed = ChangeFeed(self.db)
+        feed.subscribe(self._on_external_changes)
+        return feed
+    
+    def _on_external_changes(self, changes):
+        if changes:
+            self.result_cache.bump()
+        for seq, task_id, op in changes:
+            if op in ('reset', 'clear'):
+                self._forget_all_tasks()
+            else:
+                self._forget_tasks([task_id])
+        if changes:
+            self._invalidate_stats()
+    
+    def _forget_tasks(self, task_ids):
+        with self._task_cache_lock:
+            self._task_generation += 1
+            for task_id in task_ids:
+                self._task_cache.pop(task_id, None)
+    
+    def _forget_all_tasks(self):
+        with self._task_cache_lock:
+            self._task_generation += 1
+            self._task_cache.clear()
+    
+    def _invalidate_stats(self):
+        with self._stats_lock:
+            self.stats.invalidate()
+    
+    def _tracked_write(self, write, task_id=None):
+        # Runs write() and moves the task between the stats counters. Rows are
+        # read from the database rather than the cache, since cached tasks are
+        # updated in place. Holding the lock keeps a get_stats() reload from
+        # landing between the two reads. Without a task_id, write() returns it.
+        with self._stats_lock:
+            if not self.stats.loaded:
+                return write()
+            old_task = self.db.get_task_by_id(task_id) if task_id is not None else None
+            result = write()
+            if task_id is None:
+                task_id = result
+            new_task = self.db.get_task_by_id(task_id) if task_id is not None else None
+            self.stats.replace(old_task, new_task)
+            return result
+    
+    def _new_task(self, task_data):
+        return Task(
             id=None,
             title=task_data['title'],
             description=task_data['description'],
-            deadline=task_data['deadline'],
+            deadline=self._deadline(task_data['deadline']),
             priority=task_data.get('priority', 'Low'),
             status='Pending'
         )
-        self.db.insert_task(task)
+    
+    def _deadline(self, deadline):
+        # Deadlines may be given as datetimes or as text, e.g. '2024-12-31'
+        # (due at the end of that day) or '2024-12-31 09:30'
+        if isinstance(deadline, str):
+            return parse_deadline_text(deadline) if deadline.strip() else None
+        return deadline
+    
+    def _bound(self, bound):
+        # Range bounds may be datetimes, dates or text; a date alone means
+        # local midnight at the start of that day
+        if isinstance(bound, str):
+            return parse_bound_text(bound) if bound.strip() else None
+        if isinstance(bound, date) and not isinstance(bound, datetime):
+            return datetime.fromtimestamp(day_start_ts(bound))
+        return bound
+    
+    def _prepare_update(self, updated_data):
+        if 'deadline' in updated_data:
+            updated_data['deadline'] = self._deadline(updated_data['deadline'])
+        return updated_data
+    
+    def add_task(self, task_data):
+        task = self._new_task(task_data)
+        task_id = self._tracked_write(lambda: self.db.insert_task(task))
+        if task_id is not None:
+            self._notify('insert', [task_id])
+        return task_id
+    
+    def _mark_cached_complete(self, task_id):
+        with self._task_cache_lock:
+            self._task_generation += 1
+            task = self._task_cache.get(task_id)
+            if task is not None:
+                task.mark_complete()
     
     def edit_task(self, task_id, updated_data):
-        if isinstance(updated_data.get('deadline'), datetime):
-            updated_data['deadline'] = updated_data['deadline'].strftime('%Y-%m-%d')
-        self.db.update_task(task_id, updated_data)
+        updated_data = self._prepare_update(updated_data)
+        self._tracked_write(lambda: self.db.update_task(task_id, updated_data), task_id)
+        self._forget_tasks([task_id])
+        self._notify('update', [task_id])
     
     def delete_task(self, task_id):
-        self.db.delete_task(task_id)
+        self._tracked_write(lambda: self.db.delete_task(task_id), task_id)
+        self._forget_tasks([task_id])
+        self._notify('delete', [task_id])
     
     def mark_task_complete(self, task_id):
-        self.db.update_task(task_id, {'status': 'Completed'})
+        if self._tracked_write(lambda: self.db.update_task(task_id, {'status': 'Completed'}), task_id):
+            self._mark_cached_complete(task_id)
+        else:
+            # The cached task may no longer match the row, so reload it
+            self._forget_tasks([task_id])
+        self._notify('update', [task_id])
+    
+    def add_tasks(self, tasks_data):
+        # tasks_data may be any iterable, e.g. a generator over an import file
+        task_ids = self.db.insert_tasks(self._new_task(task_data) for task_data in tasks_data)
+        if task_ids:
+            self._invalidate_stats()
+            self._notify('insert', task_ids)
+        return task_ids
+    
+    def edit_tasks(self, updates):
+        items = updates.items() if isinstance(updates, dict) else updates
+        task_ids = []
+        
+        def prepared():
+            for task_id, updated_data in items:
+                task_ids.append(task_id)
+                yield task_id, self._prepare_update(updated_data)
+        
+        updated = self.db.update_tasks(prepared())
+        self._forget_tasks(task_ids)
+        if updated:
+            self._invalidate_stats()
+            self._notify('update', task_ids)
+        return updated
+    
+    def delete_tasks(self, task_ids):
+        deleted_ids = []
+        
+        def recorded():
+            for task_id in task_ids:
+                deleted_ids.append(task_id)
+                yield task_id
+        
+        deleted = self.db.delete_tasks(recorded())
+        self._forget_tasks(deleted_ids)
+        if deleted:
+            self._invalidate_stats()
+            self._notify('delete', deleted_ids)
+        return deleted
+    
+    def mark_tasks_complete(self, task_ids):
+        return self.edit_tasks((task_id, {'status': 'Completed'}) for task_id in task_ids)
+    
+    def export_tasks(self, path, fmt=None, progress=None):
+        # Streams every task to a CSV or JSONL file (chosen by extension unless
+        # fmt is given). progress(count) is called after each chunk.
+        return write_tasks(self.db.iter_task_chunks(CHUNK_SIZE), path, fmt, progress)
     
-    def get_tasks_by_date(self, date):
-        return self.db.get_tasks_by_deadline(date)
+    def import_tasks(self, path, fmt=None, progress=None):
+        # Adds the tasks of a CSV or JSONL file under new ids, committing every
+        # CHUNK_SIZE tasks so memory stays flat however large the file is. If
+        # a chunk fails to insert, the chunks before it stay imported and
+        # sqlite3.DatabaseError names the line the import stopped at.
+        imported = 0
+        for chunk in chunked(read_tasks(path, fmt, with_lines=True), CHUNK_SIZE):
+            task_ids = self.db.insert_tasks(task for line_number, task in chunk)
+            if not task_ids:
+                raise sqlite3.DatabaseError(
+                    f"Import stopped at {path} line {chunk[0][0]} after {imported:,} tasks; see the log for the cause"
+                )
+            imported += len(task_ids)
+            self._invalidate_stats()
+            self._notify('insert', task_ids)
+            if progress:
+                progress(imported)
+        return imported
     
-    def get_tasks_by_priority(self, priority):
-        return self.db.get_tasks_by_priority(priority)
+    def archive_completed_tasks(self, older_than=ARCHIVE_AFTER, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None):
+        # Moves tasks completed more than older_than ago out of the tasks
+        # table, batch_size per transaction, and returns how many moved. To
+        # the rest of the app archived tasks are deleted; only
+        # get_archived_tasks still returns them.
+        cutoff = datetime.now() - older_than
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            task_ids = self.db.archive_completed_tasks(cutoff, batch_size)
+            batches += 1
+            if task_ids:
+                archived += len(task_ids)
+                self._forget_tasks(task_ids)
+                self._invalidate_stats()
+                self._notify('delete', task_ids)
+            if len(task_ids) < batch_size:
+                break
+        return archived
     
-    def get_all_tasks(self):
-        return self.db.get_all_tasks()
+    def count_archived_tasks(self):
+        return self.db.count_archived_tasks()
+    
+    def get_archived_tasks(self, limit=None, offset=None):
+        return self.db.query_archived_tasks(limit=limit, offset=offset)
+    
+    def _cached(self, key, load, use_cache=True):
+        # Results are shared between callers, so lists are copied on the way
+        # out; the Task objects in them must be treated as read-only.
+        # use_cache=False is for one-off reads, e.g. a time-based range or one
+        # page of a walk, that would only push useful entries out.
+        if not use_cache:
+            return load()
+        cache = self.result_cache
+        if cache.enabled:
+            cache.observe_data_version(self.db.get_data_version())
+        result = cache.get_or_load(key, load)
+        return list(result) if isinstance(result, list) else result
+    
+    def get_tasks_by_date(self, date, as_batch=False):
+        return self._cached(
+            ('tasks_by_date', date, as_batch),
+            lambda: self.db.get_tasks_by_deadline(date, as_batch)
+        )
+    
+    def get_tasks_due_between(self, start=None, end=None, status=None, as_batch=False, use_cache=True):
+        # Tasks due in [start, end), earliest first
+        start, end = self._bound(start), self._bound(end)
+        return self._cached(
+            ('tasks_due_between', start, end, status, as_batch),
+            lambda: self.db.get_tasks_due_between(start, end, status, as_batch),
+            use_cache
+        )
+    
+    def iter_tasks_due_between(self, start=None, end=None, status=None, chunk_size=1000):
+        # Streams get_tasks_due_between, bypassing the result cache
+        start, end = self._bound(start), self._bound(end)
+        return self.db.iter_tasks_due_between(start, end, status, chunk_size)
+    
+    def get_tasks_by_priority(self, priority, as_batch=False):
+        return self._cached(
+            ('tasks_by_priority', priority, as_batch),
+            lambda: self.db.get_tasks_by_priority(priority, as_batch)
+        )
+    
+    def get_all_tasks(self, as_batch=False):
+        return self._cached(('all_tasks', as_batch), lambda: self.db.get_all_tasks(as_batch))
+    
+    def query_tasks(self, status=None, priority=None, due_before=None, order_by='id', limit=None, after_key=None, offset=None, as_batch=False, use_cache=True, before_key=None):
+        return self._cached(
+            ('query_tasks', status, priority, due_before, order_by, limit, after_key, offset, as_batch, before_key),
+            lambda: self.db.query_tasks(
+                status=status,
+                priority=priority,
+                due_before=due_before,
+                order_by=order_by,
+                limit=limit,
+                after_key=after_key,
+                offset=offset,
+                as_batch=as_batch,
+                before_key=before_key
+            ),
+            use_cache
+        )
+    
+    def iter_tasks(self, status=None, priority=None, due_before=None, order_by='id', limit=None, chunk_size=1000):
+        # Streams tasks for full scans; see Database.iter_tasks
+        return self.db.iter_tasks(
+            status=status,
+            priority=priority,
+            due_before=due_before,
+            order_by=order_by,
+            limit=limit,
+            chunk_size=chunk_size
+        )
+    
+    def search_tasks(self, query, limit=50, offset=0, status=None, priority=None, due_before=None, as_batch=False):
+        return self.db.search_tasks(
+            query,
+            limit=limit,
+            offset=offset,
+            status=status,
+            priority=priority,
+            due_before=due_before,
+            as_batch=as_batch
+        )
+    
+    def count_tasks(self, status=None, priority=None, due_before=None):
+        return self._cached(
+            ('count_tasks', status, priority, due_before),
+            lambda: self.db.count_tasks(status=status, priority=priority, due_before=due_before)
+        )
+    
+    def page_key(self, task, order_by='id'):
+        return self.db.page_key(task, order_by)
     
     def get_task_by_id(self, task_id):
-        tasks = self.get_all_tasks()
-        for task in tasks:
-            if task.id == task_id:
+        with self._task_cache_lock:
+            task = self._task_cache.get(task_id)
+            if task is not None:
+                self._task_cache.move_to_end(task_id)
+                self.cache_hits += 1
                 return task
-        return None
+            self.cache_misses += 1
+            generation = self._task_generation
+        task = self.db.get_task_by_id(task_id)
+        with self._task_cache_lock:
+            # A write that committed while the row was read may have
+            # invalidated it already, so the row could be stale
+            if task is not None and generation == self._task_generation:
+                self._task_cache[task_id] = task
+                if len(self._task_cache) > self.task_cache_size:
+                    self._task_cache.popitem(last=False)
+        return task
+    
+    def get_cache_stats(self):
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self._task_cache),
+            'results': self.result_cache.stats()
+        }
+    
+    def get_stats(self, today=None):
+        # Counts by priority, status and deadline bucket. Only the first call,
+        # or the first after a bulk or external write or a change of day, runs
+        # the GROUP BY queries; otherwise this just copies the counters.
+        today = today or date.today()
+        with self._stats_lock:
+            if not self.stats.loaded or self.stats.day != today:
+                self.stats.load(self.db, today)
+            return self.stats.snapshot()
+    
+    @property
+    def stats_version(self):
+        # Changes whenever the counts may have changed
+        return self.stats.version
     
     def clear_all_tasks(self):
-        self.db.clear_all_tasks()
\ No newline at end of file
+        self.db.clear_all_tasks()
+        self._forget_all_tasks()
+        self.result_cache.clear()
+        with self._stats_lock:
+            self.stats.reset(date.today())
+        self._notify('clear', [])
\ No newline at end of file
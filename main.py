@@ -1,11 +1,29 @@
+import os
 import sys
 import threading
+import logging
 from views.task_manager_gui import TaskManagerGUI
 from controllers.task_controller import TaskController
 from utils.notifications import NotificationManager
+from utils.logging_config import configure_logging, stop_logging
+
+logger = logging.getLogger(__name__)
 
 def main():
-    task_controller = TaskController()
+    # Log records are written on a background thread so the Tk and database
+    # threads never block on stderr. TASK_MANAGER_LOG_LEVEL sets the level.
+    configure_logging(level=os.environ.get('TASK_MANAGER_LOG_LEVEL', 'DEBUG').upper(), use_queue=True)
+    # TASK_MANAGER_RESULT_CACHE=0 turns off the controller's query result
+    # cache. TASK_MANAGER_ENGINE=memory serves tasks.db from memory, saving
+    # changes back every few seconds and on exit.
+    task_controller = TaskController(
+        result_cache=os.environ.get('TASK_MANAGER_RESULT_CACHE', '1') != '0',
+        engine=os.environ.get('TASK_MANAGER_ENGINE', 'file')
+    )
+    # Set TASK_MANAGER_SLOW_MS to record query stats; F12 logs them
+    slow_ms = os.environ.get('TASK_MANAGER_SLOW_MS')
+    if slow_ms:
+        task_controller.db.enable_instrumentation(slow_threshold_ms=float(slow_ms))
     app = TaskManagerGUI(task_controller)
     
     # Initialize Notification Manager
@@ -15,6 +33,14 @@ def main():
     
     app.mainloop()
     notification_manager.stop_scheduler()
+    scheduler_thread.join(timeout=1)
+    app.db_worker.stop(timeout=1)
+    logger.info("Input-to-paint latency: %s", app.dispatcher.latency_stats())
+    logger.info("Refreshes: %s", app.refresh_scheduler.stats())
+    logger.info("Controller cache: %s", task_controller.get_cache_stats())
+    app.dump_query_stats()
+    task_controller.close()
+    stop_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
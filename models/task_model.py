@@ -1,11 +1,63 @@
+from array import array
+from datetime import datetime
+import sys
+
 class Task:
-    def __init__(self, id, title, description, deadline, priority='Low', status='Pending'):
+    # Slots instead of a per-instance __dict__ keep large task lists small
+    __slots__ = ('id', 'title', 'description', 'deadline', 'priority', 'status', 'completed_at')
+
+    def __init__(self, id, title, description, deadline, priority='Low', status='Pending', completed_at=None):
         self.id = id
         self.title = title
         self.description = description
         self.deadline = deadline
         self.priority = priority
         self.status = status
+        # Set by the database when the task is marked complete
+        self.completed_at = completed_at
 
     def mark_complete(self):
-        self.status = 'Completed' 
\ No newline at end of file
+        self.status = 'Completed'
+        if self.completed_at is None:
+            self.completed_at = datetime.now().replace(microsecond=0)
+
+class TaskBatch:
+    # Column-oriented tasks for bulk reads: one array or list per field instead
+    # of one object per task. Task objects are only built when indexed or
+    # iterated, one at a time.
+    def __init__(self):
+        self.ids = array('q')
+        self.titles = []
+        self.descriptions = []
+        self.deadlines = []
+        self.priorities = []
+        self.statuses = []
+        self.completed_ats = []
+
+    def append(self, id, title, description, deadline, priority, status, completed_at=None):
+        self.ids.append(id)
+        self.titles.append(title)
+        self.descriptions.append(description)
+        self.deadlines.append(deadline)
+        # Priority and status only take a few values, so share the strings
+        self.priorities.append(sys.intern(priority) if priority else priority)
+        self.statuses.append(sys.intern(status) if status else status)
+        self.completed_ats.append(completed_at)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return Task(
+            id=self.ids[index],
+            title=self.titles[index],
+            description=self.descriptions[index],
+            deadline=self.deadlines[index],
+            priority=self.priorities[index],
+            status=self.statuses[index],
+            completed_at=self.completed_ats[index]
+        )
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self[index]
\ No newline at end of file
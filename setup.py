@@ -10,6 +10,8 @@ setup(
     entry_points={
         'console_scripts': [
             'task-manager=main:main',
+            'task-manager-transfer=transfer_tasks:main',
+            'task-manager-cli=cli:main',
         ],
     },
     author="David Dimalanta",
@@ -0,0 +1,64 @@
+import tkinter as tk
+from tkinter import ttk
+
+import pytest
+
+from benchmarks.fake_tk import FakeTreeview
+from controllers.task_controller import TaskController
+
+class StubTreeview(FakeTreeview):
+    # FakeTreeview plus the calls the views make to set up and scroll a
+    # Treeview, so views can be built without a display
+    def __init__(self, master=None, **options):
+        super().__init__()
+        self.options = options
+        self.selected = ()
+    
+    def heading(self, column, **options):
+        pass
+    
+    def column(self, column, **options):
+        pass
+    
+    def pack(self, **options):
+        pass
+    
+    def bind(self, sequence, func):
+        pass
+    
+    def selection(self):
+        return self.selected
+    
+    def selection_set(self, items):
+        self.selected = tuple(items)
+    
+    def yview_moveto(self, fraction):
+        pass
+    
+    def cget(self, option):
+        return self.options.get(option)
+
+class StubScrollbar:
+    def __init__(self, master=None, **options):
+        self.position = (0.0, 1.0)
+    
+    def pack(self, **options):
+        pass
+    
+    def set(self, first, last):
+        self.position = (first, last)
+
+@pytest.fixture
+def headless_tk(monkeypatch):
+    # Frames skip Tk entirely and Treeviews are stubs, so view code runs
+    # without a display
+    monkeypatch.setattr(tk.Frame, '__init__', lambda self, master=None, **options: None)
+    monkeypatch.setattr(tk.Frame, 'pack', lambda self, **options: None)
+    monkeypatch.setattr(ttk, 'Treeview', StubTreeview)
+    monkeypatch.setattr(ttk, 'Scrollbar', StubScrollbar)
+
+@pytest.fixture
+def controller(tmp_path):
+    controller = TaskController(str(tmp_path / 'tasks.db'))
+    yield controller
+    controller.close()
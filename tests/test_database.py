@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.task_model import Task
+from utils.database import Database
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'tasks.db'))
+    db.create_tasks_table()
+    yield db
+    db.close()
+
+@pytest.mark.parametrize('order_by', ['id', 'deadline', 'priority'])
+def test_keyset_pages_match_offset_pages(db, order_by):
+    start = datetime(2030, 1, 1, 9)
+    db.insert_tasks(
+        Task(None, f"Task {i}", '', start + timedelta(hours=i % 7) if i % 5 else None, ['High', 'Medium', 'Low'][i % 3])
+        for i in range(200)
+    )
+    expected = [task.id for task in db.query_tasks(order_by=order_by)]
+    anchor = db.query_tasks(order_by=order_by, limit=1, offset=100)[0]
+    key = db.page_key(anchor, order_by)
+    assert [task.id for task in db.query_tasks(order_by=order_by, limit=30, after_key=key)] == expected[101:131]
+    assert [task.id for task in db.query_tasks(order_by=order_by, limit=30, before_key=key)] == expected[70:100]
+    assert [task.id for task in db.query_tasks(order_by=order_by, limit=500, before_key=key)] == expected[:100]
+
+def test_completed_tasks_list_newest_first(db):
+    start = datetime(2030, 1, 1, 9)
+    db.insert_tasks(
+        Task(None, f"Task {i}", '', None, status='Completed', completed_at=start + timedelta(hours=i % 9))
+        for i in range(100)
+    )
+    tasks = db.query_tasks(status='Completed', order_by='completed_at')
+    assert [(task.completed_at, task.id) for task in tasks] == sorted(
+        ((task.completed_at, task.id) for task in tasks), reverse=True
+    )
+    expected = [task.id for task in tasks]
+    key = db.page_key(tasks[50], 'completed_at')
+    assert [task.id for task in db.query_tasks(status='Completed', order_by='completed_at', limit=20, after_key=key)] == expected[51:71]
+    assert [task.id for task in db.query_tasks(status='Completed', order_by='completed_at', limit=20, before_key=key)] == expected[30:50]
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+
+from utils.database import SCHEMA_VERSION, Database
+from utils.deadlines import deadline_to_ts
+
+@pytest.fixture
+def open_db(tmp_path):
+    opened = []
+    
+    def open_db(name):
+        db = Database(str(tmp_path / name))
+        opened.append(db)
+        return db
+    yield open_db
+    for db in opened:
+        db.close()
+
+def schema(db):
+    with db.reading() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")
+        objects = set(cursor.fetchall())
+        columns = {}
+        for kind, name in objects:
+            if kind == 'table':
+                cursor.execute(f'PRAGMA table_info({name})')
+                columns[name] = {row[1] for row in cursor.fetchall()}
+    return objects, columns
+
+def test_new_database_matches_migrated_schema(open_db):
+    new = open_db('new.db')
+    new.create_tasks_table()
+    migrated = open_db('migrated.db')
+    migrated.create_tasks_table(target_version=0)
+    migrated.migrate()
+    assert new.get_schema_version() == migrated.get_schema_version() == SCHEMA_VERSION
+    objects, columns = schema(new)
+    migrated_objects, migrated_columns = schema(migrated)
+    assert objects == migrated_objects
+    # Only the text deadline columns migration 6 left behind differ
+    assert 'deadline' not in columns['tasks'] and 'deadline' not in columns['archived_tasks']
+    for table, names in migrated_columns.items():
+        assert columns[table] == names - {'deadline'}
+
+def test_migration_6_converts_text_deadlines(open_db):
+    db = open_db('tasks.db')
+    db.create_tasks_table(target_version=5)
+    deadlines = ['2030-01-02', '2030-01-02 09:30', '2030-01-02T09:30:15', None]
+    with db.writing() as cursor:
+        cursor.executemany(
+            'INSERT INTO tasks (title, deadline) VALUES (?, ?)',
+            [(f'Task {i}', deadline) for i, deadline in enumerate(deadlines)]
+        )
+        cursor.executemany(
+            "INSERT INTO archived_tasks (id, title, deadline, status, archived_at) VALUES (?, ?, ?, 'Completed', '2030-01-01')",
+            [(100 + i, f'Archived {i}', deadline) for i, deadline in enumerate(deadlines)]
+        )
+    db.migrate(target_version=6)
+    expected = [
+        deadline_to_ts(datetime(2030, 1, 2, 23, 59, 59)),
+        deadline_to_ts(datetime(2030, 1, 2, 9, 30)),
+        deadline_to_ts(datetime(2030, 1, 2, 9, 30, 15)),
+        None,
+    ]
+    with db.reading() as cursor:
+        cursor.execute('SELECT deadline_ts FROM tasks ORDER BY id')
+        assert [row[0] for row in cursor.fetchall()] == expected
+        cursor.execute('SELECT deadline_ts FROM archived_tasks ORDER BY id')
+        assert [row[0] for row in cursor.fetchall()] == expected
+    assert [task.deadline for task in db.query_tasks()] == [
+        datetime(2030, 1, 2, 23, 59, 59), datetime(2030, 1, 2, 9, 30), datetime(2030, 1, 2, 9, 30, 15), None
+    ]
+
+def test_baseline_database_migrates_to_latest(open_db):
+    db = open_db('tasks.db')
+    db.create_tasks_table(target_version=0)
+    with db.writing() as cursor:
+        cursor.executemany(
+            'INSERT INTO tasks (title, description, deadline, priority, status) VALUES (?, ?, ?, ?, ?)',
+            [
+                ('Write report', 'quarterly numbers', '2030-01-02', 'High', 'Pending'),
+                ('Book flights', '', None, 'Low', 'Completed'),
+            ]
+        )
+    db.migrate()
+    assert db.get_schema_version() == SCHEMA_VERSION
+    tasks = db.query_tasks()
+    assert [(task.title, task.priority, task.status) for task in tasks] == [
+        ('Write report', 'High', 'Pending'), ('Book flights', 'Low', 'Completed')
+    ]
+    assert tasks[0].deadline == datetime(2030, 1, 2, 23, 59, 59)
+    assert tasks[0].completed_at is None and tasks[1].completed_at is not None
+    assert [task.title for task in db.search_tasks('quart')] == ['Write report']
+    objects, _ = schema(db)
+    indexes = {name for kind, name in objects if kind == 'index'}
+    assert not indexes & {'idx_tasks_priority', 'idx_tasks_status', 'idx_tasks_deadline', 'idx_tasks_status_deadline'}
+    # Triggers added along the way keep working on the migrated table
+    db.update_task(tasks[0].id, {'status': 'Completed'})
+    assert db.get_task_by_id(tasks[0].id).completed_at is not None
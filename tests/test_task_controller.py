@@ -0,0 +1,67 @@
+import sqlite3
+from datetime import datetime
+
+from controllers.task_controller import TaskController
+
+def test_due_between_dates_covers_whole_days(controller):
+    controller.add_task({'title': 'first', 'description': '', 'deadline': '2030-01-01 09:00'})
+    controller.add_task({'title': 'second', 'description': '', 'deadline': '2030-01-02'})
+    controller.add_task({'title': 'third', 'description': '', 'deadline': '2030-01-03 09:00'})
+    tasks = controller.get_tasks_due_between('2030-01-01', '2030-01-03')
+    assert [task.title for task in tasks] == ['first', 'second']
+    streamed = controller.iter_tasks_due_between('2030-01-01', '2030-01-03')
+    assert [task.title for task in streamed] == ['first', 'second']
+    assert [task.title for task in controller.get_tasks_due_between(datetime(2030, 1, 1, 10), '2030-01-03 09:00')] == ['second']
+
+def test_result_cache_drops_results_after_local_write(controller):
+    controller.add_task({'title': 'first', 'description': '', 'deadline': None})
+    assert [task.title for task in controller.query_tasks()] == ['first']
+    assert controller.count_tasks() == 1
+    second = controller.add_task({'title': 'second', 'description': '', 'deadline': None})
+    assert [task.title for task in controller.query_tasks()] == ['first', 'second']
+    assert controller.count_tasks() == 2
+    controller.edit_task(second, {'title': 'renamed'})
+    assert [task.title for task in controller.query_tasks()] == ['first', 'renamed']
+    controller.delete_task(second)
+    assert [task.title for task in controller.query_tasks()] == ['first']
+
+def test_result_cache_drops_results_after_external_write(controller):
+    controller.add_task({'title': 'first', 'description': '', 'deadline': None})
+    assert [task.title for task in controller.query_tasks()] == ['first']
+    assert [task.title for task in controller.query_tasks()] == ['first']
+    assert controller.result_cache.hits == 1
+    # Another process writing to the same file bumps PRAGMA data_version
+    other = sqlite3.connect(controller.db.db_path)
+    try:
+        with other:
+            other.execute("INSERT INTO tasks (title, description) VALUES ('external', '')")
+    finally:
+        other.close()
+    assert [task.title for task in controller.query_tasks()] == ['first', 'external']
+    assert controller.result_cache.invalidations > 0
+
+def test_identity_map_keeps_row_after_failed_write(controller):
+    task_id = controller.add_task({'title': 'first', 'description': '', 'deadline': None})
+    cached = controller.get_task_by_id(task_id)
+    with controller.db.writing() as cursor:
+        cursor.execute("CREATE TRIGGER reject BEFORE UPDATE ON tasks BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    controller.mark_task_complete(task_id)
+    controller.edit_task(task_id, {'title': 'renamed'})
+    assert cached.status == 'Pending'
+    task = controller.get_task_by_id(task_id)
+    assert (task.title, task.status, task.completed_at) == ('first', 'Pending', None)
+
+def test_identity_map_is_bounded(tmp_path):
+    controller = TaskController(str(tmp_path / 'tasks.db'), task_cache_size=3)
+    try:
+        task_ids = [controller.add_task({'title': f'Task {i}', 'description': '', 'deadline': None}) for i in range(5)]
+        for task_id in task_ids:
+            controller.get_task_by_id(task_id)
+        assert controller.get_cache_stats()['size'] == 3
+        # The least recently used tasks were dropped first
+        controller.get_task_by_id(task_ids[-1])
+        controller.get_task_by_id(task_ids[0])
+        stats = controller.get_cache_stats()
+        assert (stats['hits'], stats['misses'], stats['size']) == (1, 6, 3)
+    finally:
+        controller.close()
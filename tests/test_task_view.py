@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from models.task_model import Task
+from views.task_view import TaskView
+
+class StubController:
+    def __init__(self, count):
+        self.tasks = [
+            Task(task_id, f"Task {task_id}", '', datetime(2030, 1, 1, 9), 'Low')
+            for task_id in range(1, count + 1)
+        ]
+    
+    def query_tasks(self, limit=None, offset=None, **filters):
+        offset = offset or 0
+        return self.tasks[offset:offset + limit]
+    
+    def count_tasks(self, **filters):
+        return len(self.tasks)
+    
+    def get_task_by_id(self, task_id):
+        return self.tasks[task_id - 1]
+
+def test_task_view_builds_and_shows_first_rows(headless_tk):
+    view = TaskView(None, StubController(100), show_overlay=lambda *args, **kwargs: None)
+    assert view.tree.get_children() == tuple(str(task_id) for task_id in range(1, 11))
+    assert view.tree.item('1')['values'] == [1, 'Task 1', '', '2030-01-01 09:00', 'Low', 'Pending']
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+import controllers.task_controller as task_controller
+import transfer_tasks
+from controllers.task_controller import TaskController
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_export_import_keeps_completed_at(tmp_path, controller, extension):
+    done = controller.add_task({'title': 'done', 'description': '', 'deadline': '2030-01-01'})
+    controller.add_task({'title': 'open', 'description': '', 'deadline': None})
+    controller.mark_task_complete(done)
+    with controller.db.writing() as cursor:
+        cursor.execute("UPDATE tasks SET completed_at = '2020-05-06T07:08:09' WHERE id = ?", (done,))
+    path = str(tmp_path / f'tasks.{extension}')
+    assert controller.export_tasks(path) == 2
+    
+    target = TaskController(str(tmp_path / 'copy.db'))
+    try:
+        assert target.import_tasks(path) == 2
+        tasks = {task.title: task for task in target.get_all_tasks()}
+    finally:
+        target.close()
+    assert tasks['done'].status == 'Completed'
+    assert tasks['done'].completed_at.isoformat() == '2020-05-06T07:08:09'
+    assert tasks['open'].completed_at is None
+
+def test_failed_import_raises_with_line(tmp_path, controller, monkeypatch):
+    monkeypatch.setattr(task_controller, 'CHUNK_SIZE', 2)
+    path = tmp_path / 'tasks.csv'
+    path.write_text('title,description\n' + ''.join(f'{title},\n' for title in ['a', 'b', 'c', 'bad', 'e']))
+    with controller.db.writing() as cursor:
+        cursor.execute("CREATE TRIGGER reject BEFORE INSERT ON tasks WHEN new.title = 'bad' BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    with pytest.raises(sqlite3.DatabaseError, match=r'line 4 after 2 tasks'):
+        controller.import_tasks(str(path))
+    assert [task.title for task in controller.get_all_tasks()] == ['a', 'b']
+
+def test_transfer_tool_exits_non_zero_on_failed_import(tmp_path, capsys):
+    db_path = str(tmp_path / 'tasks.db')
+    controller = TaskController(db_path)
+    with controller.db.writing() as cursor:
+        cursor.execute("CREATE TRIGGER reject BEFORE INSERT ON tasks BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    controller.close()
+    path = tmp_path / 'tasks.csv'
+    path.write_text('title\nonly\n')
+    assert transfer_tasks.main(['import', str(path), '--db', db_path]) == 1
+    assert 'Import stopped' in capsys.readouterr().err
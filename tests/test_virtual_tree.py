@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from controllers.task_controller import TaskController
+from views.virtual_tree import VirtualTreeview
+
+ORDER = 'priority'
+
+@pytest.fixture
+def controller(tmp_path):
+    controller = TaskController(str(tmp_path / 'tasks.db'))
+    controller.add_tasks(
+        {'title': f"Task {i}", 'description': '', 'deadline': None, 'priority': ['High', 'Medium', 'Low'][i % 3]}
+        for i in range(1000)
+    )
+    yield controller
+    controller.close()
+
+def make_list(controller, calls):
+    def fetch_rows(offset, limit):
+        calls.append('offset')
+        return controller.query_tasks(order_by=ORDER, limit=limit, offset=offset)
+    
+    def fetch_after(task, limit):
+        calls.append('after')
+        return controller.query_tasks(order_by=ORDER, limit=limit, after_key=controller.page_key(task, ORDER))
+    
+    def fetch_before(task, limit):
+        calls.append('before')
+        return controller.query_tasks(order_by=ORDER, limit=limit, before_key=controller.page_key(task, ORDER))
+    
+    view = VirtualTreeview(
+        None, ('ID',), lambda task: (task.id,), fetch_rows, controller.count_tasks,
+        fetch_after=fetch_after, fetch_before=fetch_before
+    )
+    view.refresh()
+    return view
+
+def shown(view):
+    return [int(iid) for iid in view.tree.get_children()]
+
+def test_scrolling_reads_adjacent_rows_by_keyset(headless_tk, controller):
+    calls = []
+    view = make_list(controller, calls)
+    expected = [task.id for task in controller.query_tasks(order_by=ORDER)]
+    rng = random.Random(1)
+    steps = [3] * 200 + [-10] * 80 + [rng.randint(-15, 15) for _ in range(300)] + [10] * 100
+    for step in steps:
+        view.scroll_rows(step)
+        assert shown(view) == expected[view.offset:view.offset + view.visible_rows]
+        assert len(view.buffer) <= view.visible_rows + 2 * view.overscan
+    # Only the first load used OFFSET; every scroll after it extended the buffer
+    assert calls.count('offset') == 1
+    assert calls.count('after') and calls.count('before')
+    assert view.total == len(expected)
+
+def test_jump_away_from_buffer_reads_by_offset(headless_tk, controller):
+    calls = []
+    view = make_list(controller, calls)
+    expected = [task.id for task in controller.query_tasks(order_by=ORDER)]
+    view.yview('moveto', '0.75')
+    assert calls == ['offset', 'offset']
+    assert shown(view) == expected[750:760]
@@ -0,0 +1,44 @@
+import argparse
+import logging
+import sqlite3
+import sys
+from controllers.task_controller import TaskController
+from utils.logging_config import configure_logging
+
+# Usage:
+#   python transfer_tasks.py export tasks.csv
+#   python transfer_tasks.py import tasks.jsonl --db path/to/tasks.db
+# The format follows the file extension (.csv, .jsonl or .ndjson) unless
+# --format is given.
+
+def report(action):
+    def progress(count):
+        print(f"\r{action} {count:,} tasks", end='', file=sys.stderr, flush=True)
+    return progress
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export tasks as CSV or JSONL.")
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'jsonl'])
+    parser.add_argument('--db', default='utils/tasks.db', help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+    configure_logging(level=logging.WARNING)
+
+    controller = TaskController(args.db)
+    try:
+        if args.action == 'export':
+            count = controller.export_tasks(args.path, args.format, progress=report('Exported'))
+            print(f"\nExported {count:,} tasks to {args.path}")
+        else:
+            count = controller.import_tasks(args.path, args.format, progress=report('Imported'))
+            print(f"\nImported {count:,} tasks from {args.path}")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        return 1
+    finally:
+        controller.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
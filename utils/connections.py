@@ -0,0 +1,237 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+def is_memory_path(db_path):
+    return db_path == ':memory:' or db_path.startswith('file::memory:')
+
+class ConnectionPool:
+    # SQLite connections for one database file. All writes go through a
+    # single write connection, one transaction at a time. Reads borrow one of
+    # at most pool_size read-only connections and, with the WAL journal,
+    # never wait for the writer. An in-memory database cannot be shared
+    # between connections, so there reads use the write connection too.
+    def __init__(self, db_path, pool_size=4, synchronous='NORMAL', busy_timeout_ms=5000,
+                 write_retries=5, retry_delay=0.05, acquire_timeout=30):
+        if synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+        self.db_path = db_path
+        self.pool_size = 0 if is_memory_path(db_path) else pool_size
+        self.synchronous = synchronous.upper()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.write_retries = write_retries
+        self.retry_delay = retry_delay
+        self.acquire_timeout = acquire_timeout
+        # Reentrant so a write transaction can call other writing methods,
+        # which then join the outer transaction
+        self.write_lock = threading.RLock()
+        self.write_depth = 0
+        self.available = threading.Condition()
+        self.idle = []
+        self.open_readers = 0
+        self.closed = False
+        self.writer = self._connect()
+        self.journal_mode = self.writer.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        self.writer.execute(f'PRAGMA synchronous={self.synchronous}')
+    
+    def _connect(self, read_only=False):
+        # Connections move between threads, but only ever serve one at a time.
+        # isolation_level=None leaves transactions to transaction(), so no
+        # connection holds a read snapshot open between statements.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        if read_only:
+            conn.execute('PRAGMA query_only=ON')
+        return conn
+    
+    def acquire_reader(self):
+        with self.available:
+            deadline = time.monotonic() + self.acquire_timeout
+            while not self.idle and self.open_readers >= self.pool_size:
+                if self.closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.available.wait(remaining):
+                    raise sqlite3.OperationalError(f"No read connection free after {self.acquire_timeout}s")
+            if self.closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if self.idle:
+                return self.idle.pop()
+            self.open_readers += 1
+        try:
+            return self._connect(read_only=True)
+        except sqlite3.Error:
+            with self.available:
+                self.open_readers -= 1
+                self.available.notify()
+            raise
+    
+    def release_reader(self, conn):
+        with self.available:
+            if self.closed:
+                self.open_readers -= 1
+                conn.close()
+            else:
+                self.idle.append(conn)
+            self.available.notify()
+    
+    @contextmanager
+    def reader(self):
+        if not self.pool_size:
+            with self.write_lock:
+                yield self.writer
+            return
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+    
+    def _begin(self):
+        # BEGIN IMMEDIATE takes the write lock up front. busy_timeout already
+        # waits for other processes' writes; if one holds the lock longer
+        # than that, back off and try again a few times before giving up.
+        # Once BEGIN succeeds the rest of the transaction cannot hit SQLITE_BUSY,
+        # so callers never have to replay work.
+        for attempt in range(self.write_retries + 1):
+            try:
+                self.writer.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as e:
+                if attempt == self.write_retries or ('locked' not in str(e) and 'busy' not in str(e)):
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                logger.debug("Database %s is locked, retrying in %.2fs", self.db_path, delay)
+                time.sleep(delay)
+    
+    @contextmanager
+    def transaction(self):
+        # Yields the write connection inside a transaction, committed when the
+        # block exits and rolled back if it raises
+        with self.write_lock:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if self.write_depth:
+                self.write_depth += 1
+                try:
+                    yield self.writer
+                finally:
+                    self.write_depth -= 1
+                return
+            self._begin()
+            self.write_depth = 1
+            try:
+                yield self.writer
+                self.writer.commit()
+            except BaseException:
+                self.writer.rollback()
+                raise
+            finally:
+                self.write_depth = 0
+    
+    def close(self):
+        # Idle readers close now and borrowed ones when they are returned.
+        # Closing the write connection last checkpoints the WAL into the
+        # database file.
+        with self.available:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.open_readers -= len(idle)
+            self.available.notify_all()
+        for conn in idle:
+            conn.close()
+        with self.write_lock:
+            self.writer.close()
+
+class MemoryConnectionPool(ConnectionPool):
+    # Serves a database file from memory. The file is copied into a private
+    # :memory: database with the backup API when the pool opens; every read
+    # and write then runs in memory, and a background thread copies the
+    # database back to the file every persist_interval seconds when a write
+    # has committed since the last copy. close() copies any remaining
+    # changes. Writes made to the file by other processes meanwhile are
+    # overwritten, so only one process should open a file this way.
+    def __init__(self, db_path, persist_interval=5.0, busy_timeout_ms=5000, **kwargs):
+        super().__init__(':memory:', busy_timeout_ms=busy_timeout_ms, **kwargs)
+        self.file_path = db_path
+        self.persist_interval = persist_interval
+        self.dirty = False
+        # Held for a whole save, so snapshots reach the file in order
+        self.persist_lock = threading.Lock()
+        self.persist_count = 0
+        self.last_persist_seconds = None
+        self.last_persist_lock_seconds = None
+        start = time.perf_counter()
+        source = sqlite3.connect(db_path)
+        try:
+            source.backup(self.writer)
+        finally:
+            source.close()
+        logger.debug("Loaded %s into memory in %.3fs", db_path, time.perf_counter() - start)
+        self.stopping = threading.Event()
+        self.persister = threading.Thread(target=self._persist_loop, name='db-persist', daemon=True)
+        self.persister.start()
+    
+    @contextmanager
+    def transaction(self):
+        with super().transaction() as conn:
+            yield conn
+        # Only reached once the transaction has committed
+        self.dirty = True
+    
+    def persist(self):
+        # Copies the in-memory database to the file if anything changed since
+        # the last copy, and returns whether it did. Other reads and writes
+        # only wait for a memory-to-memory snapshot; the snapshot is written
+        # to the file after the lock is released. That write is one
+        # transaction on the file, so readers of the file see either the old
+        # or the new contents.
+        with self.persist_lock:
+            with self.write_lock:
+                if not self.dirty or self.closed:
+                    return False
+                start = time.perf_counter()
+                snapshot = sqlite3.connect(':memory:')
+                self.writer.backup(snapshot)
+                self.dirty = False
+                self.last_persist_lock_seconds = time.perf_counter() - start
+            try:
+                target = sqlite3.connect(self.file_path, timeout=self.busy_timeout_ms / 1000)
+                try:
+                    snapshot.backup(target)
+                finally:
+                    target.close()
+            except BaseException:
+                self.dirty = True
+                raise
+            finally:
+                snapshot.close()
+            self.persist_count += 1
+            self.last_persist_seconds = time.perf_counter() - start
+        logger.debug(
+            "Saved %s from memory in %.3fs (%.3fs holding the write lock)",
+            self.file_path, self.last_persist_seconds, self.last_persist_lock_seconds
+        )
+        return True
+    
+    def _persist_loop(self):
+        while not self.stopping.wait(self.persist_interval):
+            try:
+                self.persist()
+            except sqlite3.Error as e:
+                # Stays dirty, so the next interval tries again
+                logger.error("Failed to save %s from memory: %s", self.file_path, e)
+    
+    def close(self):
+        self.stopping.set()
+        self.persister.join()
+        try:
+            self.persist()
+        finally:
+            super().close()
@@ -1,105 +1,977 @@
+import re
 import sqlite3
-import threading
-from models.task_model import Task
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from models.task_model import Task, TaskBatch
+from datetime import datetime, timedelta
+from utils.connections import ConnectionPool, MemoryConnectionPool
+from utils.deadlines import day_range_ts, day_start_ts, deadline_from_ts, deadline_to_ts
+from utils.query_stats import InstrumentedCursor, QueryStats
 import logging
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
-class Database:
-    _local = threading.local()
-    
-    def __init__(self, db_path='utils/tasks.db'):
-        self.db_path = db_path
-        self._init_connection()
-        logging.debug(f"Database initialized with path: {self.db_path}")
-    
-    def _init_connection(self):
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
-            self._local.cursor = self._local.connection.cursor()
-    
-    @property
-    def conn(self):
-        self._init_connection()
-        return self._local.connection
-    
-    @property
-    def cursor(self):
-        self._init_connection()
-        return self._local.cursor
-    
-    def create_tasks_table(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+# Sort expressions used by query_tasks. Tasks without a deadline sort last and
+# priorities sort High > Medium > Low, as the GUI has always shown them.
+NO_DEADLINE = 2**63 - 1
+DEADLINE_KEY = f"COALESCE(deadline_ts, {NO_DEADLINE})"
+PRIORITY_RANK = "(CASE priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 2 ELSE 3 END)"
+PRIORITY_RANKS = {'High': 0, 'Medium': 1, 'Low': 2}
+
+ORDER_KEYS = {
+    'id': 'id',
+    'deadline': DEADLINE_KEY,
+    'priority': PRIORITY_RANK,
+    'completed_at': 'completed_at',
+}
+# Orders shown newest first. completed_at is only set on completed tasks, so
+# it is meant for listing those.
+DESCENDING_ORDERS = {'completed_at'}
+
+# Columns of a task row in the order row_to_task reads them
+TASK_COLUMNS = ('id', 'title', 'description', 'deadline_ts', 'priority', 'status', 'completed_at')
+SELECT_TASKS = 'SELECT ' + ', '.join(TASK_COLUMNS) + ' FROM tasks'
+
+# deadline_ts as text in the form parse_deadline_text reads, for exports
+DEADLINE_TEXT = """
+    CASE
+        WHEN deadline_ts IS NULL THEN NULL
+        WHEN time(deadline_ts, 'unixepoch', 'localtime') = '23:59:59' THEN date(deadline_ts, 'unixepoch', 'localtime')
+        ELSE strftime('%Y-%m-%d %H:%M', deadline_ts, 'unixepoch', 'localtime')
+    END
+"""
+
+# Storage engines for Database: 'file' reads and writes the database file
+# through a connection pool; 'memory' works on an in-memory copy of it and
+# saves changes back every persist_interval seconds and on close()
+ENGINES = ('file', 'memory')
+
+# Number of changelog entries kept for ChangeFeed readers
+CHANGELOG_SIZE = 10000
+
+# Current local time in the same format as datetime.isoformat(timespec='seconds')
+LOCAL_NOW = "strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')"
+
+# bm25 column weights for search_tasks: a match in the title counts ten times
+# as much as one in the description
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+def fts_query(text):
+    # Turns free text into an FTS5 query where every word must match as a
+    # prefix. Words are quoted so FTS5 operators typed by the user are taken
+    # literally.
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+# The text deadline column of schema versions before 6 as epoch seconds
+LEGACY_DEADLINE_TS = """
+    CAST(strftime(
+        '%s',
+        CASE WHEN length(deadline) = 10 THEN deadline || ' 23:59:59' ELSE deadline END,
+        'utc'
+    ) AS INTEGER)
+"""
+
+# Each migration is (version, statements). Versions must increase; a database
+# created before schema versioning existed is treated as version 0.
+MIGRATIONS = [
+    (1, [
+        'CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(deadline)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline ON tasks(status, deadline)',
+        'ANALYZE',
+    ]),
+    (2, [
+        # Expression indexes matching ORDER_KEYS so sorted pages of one status
+        # are read straight from the index
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline_key ON tasks(status, COALESCE(deadline, '9999-12-31'))",
+        f"CREATE INDEX IF NOT EXISTS idx_tasks_status_priority_rank ON tasks(status, {PRIORITY_RANK})",
+        'ANALYZE',
+    ]),
+    (3, [
+        # Changelog written by triggers so any connection, including other
+        # processes, can ask what changed since a sequence number
+        '''
+            CREATE TABLE IF NOT EXISTS task_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                op TEXT NOT NULL
+            )
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_log_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO task_changes (task_id, op) VALUES (new.id, 'insert');
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_log_update AFTER UPDATE ON tasks BEGIN
+                INSERT INTO task_changes (task_id, op) VALUES (new.id, 'update');
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_log_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO task_changes (task_id, op) VALUES (old.id, 'delete');
+            END
+        ''',
+        # Keep the changelog bounded; readers that fall further behind than
+        # this see a gap and reload instead
+        f'''
+            CREATE TRIGGER IF NOT EXISTS task_changes_prune AFTER INSERT ON task_changes
+            WHEN new.seq % 1000 = 0 BEGIN
+                DELETE FROM task_changes WHERE seq <= new.seq - {CHANGELOG_SIZE};
+            END
+        ''',
+    ]),
+    (4, [
+        # Full-text index over title and description. It stores no copy of the
+        # text (content='tasks'); the triggers keep it in step with the table.
+        # The prefix indexes make 2 and 3 character prefix queries cheap.
+        '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                title, description,
+                content='tasks', content_rowid='id', prefix='2 3'
+            )
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        ''',
+        # Index the tasks that existed before this migration
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+    ]),
+    (5, [
+        # When each task was completed, kept by triggers so every write path
+        # (single, bulk, import, other processes) records it
+        'ALTER TABLE tasks ADD COLUMN completed_at TEXT',
+        # The changelog only needs user-visible changes; without the column
+        # list the completed_at triggers below would log every update twice
+        'DROP TRIGGER IF EXISTS tasks_log_update',
+        '''
+            CREATE TRIGGER tasks_log_update AFTER UPDATE OF title, description, deadline, priority, status ON tasks BEGIN
+                INSERT INTO task_changes (task_id, op) VALUES (new.id, 'update');
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_at AFTER UPDATE OF status ON tasks
+            WHEN new.status IS NOT old.status BEGIN
+                UPDATE tasks SET completed_at = CASE WHEN new.status = 'Completed' THEN {LOCAL_NOW} END
+                WHERE id = new.id;
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_at_insert AFTER INSERT ON tasks
+            WHEN new.status = 'Completed' AND new.completed_at IS NULL BEGIN
+                UPDATE tasks SET completed_at = {LOCAL_NOW} WHERE id = new.id;
+            END
+        ''',
+        # Tasks completed before this migration count as completed now
+        f"UPDATE tasks SET completed_at = {LOCAL_NOW} WHERE status = 'Completed'",
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status_completed_at ON tasks(status, completed_at)',
+        # Completed tasks moved out of tasks by archive_completed_tasks. They
+        # keep their ids, which AUTOINCREMENT never hands out again.
+        '''
+            CREATE TABLE IF NOT EXISTS archived_tasks (
+                id INTEGER PRIMARY KEY,
                 title TEXT NOT NULL,
                 description TEXT,
                 deadline TEXT,
-                priority TEXT DEFAULT 'Low',
-                status TEXT DEFAULT 'Pending'
+                priority TEXT,
+                status TEXT,
+                completed_at TEXT,
+                archived_at TEXT NOT NULL
+            )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_archived_tasks_completed_at ON archived_tasks(completed_at)',
+    ]),
+    (6, [
+        # Deadlines move from text to epoch seconds. A bare 'YYYY-MM-DD' is due
+        # at the end of that day, local time; text with a time of day keeps it. The old deadline columns stay behind unused: DROP COLUMN
+        # needs SQLite 3.35, older than many Pythons setup.py supports ship.
+        'ALTER TABLE tasks ADD COLUMN deadline_ts INTEGER',
+        f"UPDATE tasks SET deadline_ts = {LEGACY_DEADLINE_TS} WHERE deadline IS NOT NULL",
+        'DROP INDEX IF EXISTS idx_tasks_deadline',
+        'DROP INDEX IF EXISTS idx_tasks_status_deadline',
+        'DROP INDEX IF EXISTS idx_tasks_status_deadline_key',
+        'DROP TRIGGER IF EXISTS tasks_log_update',
+        '''
+            CREATE TRIGGER tasks_log_update AFTER UPDATE OF title, description, deadline_ts, priority, status ON tasks BEGIN
+                INSERT INTO task_changes (task_id, op) VALUES (new.id, 'update');
+            END
+        ''',
+        # Range scans for get_tasks_due_between, and sorted pages per status
+        'CREATE INDEX IF NOT EXISTS idx_tasks_deadline_ts ON tasks(deadline_ts)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline_ts ON tasks(status, deadline_ts)',
+        f"CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline_key ON tasks(status, {DEADLINE_KEY})",
+        'ALTER TABLE archived_tasks ADD COLUMN deadline_ts INTEGER',
+        f"UPDATE archived_tasks SET deadline_ts = {LEGACY_DEADLINE_TS} WHERE deadline IS NOT NULL",
+        'ANALYZE',
+    ]),
+    (7, [
+        # priority and status only take 2-3 values, so an equality filter on
+        # either matches a large share of the table, and a plain scan beats an
+        # index lookup plus a table fetch per row. The (status, ...) indexes
+        # still serve sorted pages of one status.
+        'DROP INDEX IF EXISTS idx_tasks_priority',
+        'DROP INDEX IF EXISTS idx_tasks_status',
+        'ANALYZE',
+    ]),
+]
+
+# The schema MIGRATIONS ends at, created in one go for new databases. It has
+# none of the columns and indexes later migrations left unused, such as the
+# text deadline columns. Change it together with MIGRATIONS.
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+SCHEMA = [
+    '''
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline_ts INTEGER,
+            priority TEXT DEFAULT 'Low',
+            status TEXT DEFAULT 'Pending',
+            completed_at TEXT
+        )
+    ''',
+    'CREATE INDEX idx_tasks_deadline_ts ON tasks(deadline_ts)',
+    'CREATE INDEX idx_tasks_status_deadline_ts ON tasks(status, deadline_ts)',
+    f"CREATE INDEX idx_tasks_status_deadline_key ON tasks(status, {DEADLINE_KEY})",
+    f"CREATE INDEX idx_tasks_status_priority_rank ON tasks(status, {PRIORITY_RANK})",
+    'CREATE INDEX idx_tasks_status_completed_at ON tasks(status, completed_at)',
+    '''
+        CREATE TABLE task_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''',
+    '''
+        CREATE TRIGGER tasks_log_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (new.id, 'insert');
+        END
+    ''',
+    '''
+        CREATE TRIGGER tasks_log_update AFTER UPDATE OF title, description, deadline_ts, priority, status ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (new.id, 'update');
+        END
+    ''',
+    '''
+        CREATE TRIGGER tasks_log_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (old.id, 'delete');
+        END
+    ''',
+    f'''
+        CREATE TRIGGER task_changes_prune AFTER INSERT ON task_changes
+        WHEN new.seq % 1000 = 0 BEGIN
+            DELETE FROM task_changes WHERE seq <= new.seq - {CHANGELOG_SIZE};
+        END
+    ''',
+    '''
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            title, description,
+            content='tasks', content_rowid='id', prefix='2 3'
+        )
+    ''',
+    '''
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''',
+    '''
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    ''',
+    '''
+        CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''',
+    f'''
+        CREATE TRIGGER tasks_completed_at AFTER UPDATE OF status ON tasks
+        WHEN new.status IS NOT old.status BEGIN
+            UPDATE tasks SET completed_at = CASE WHEN new.status = 'Completed' THEN {LOCAL_NOW} END
+            WHERE id = new.id;
+        END
+    ''',
+    f'''
+        CREATE TRIGGER tasks_completed_at_insert AFTER INSERT ON tasks
+        WHEN new.status = 'Completed' AND new.completed_at IS NULL BEGIN
+            UPDATE tasks SET completed_at = {LOCAL_NOW} WHERE id = new.id;
+        END
+    ''',
+    '''
+        CREATE TABLE archived_tasks (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline_ts INTEGER,
+            priority TEXT,
+            status TEXT,
+            completed_at TEXT,
+            archived_at TEXT NOT NULL
+        )
+    ''',
+    'CREATE INDEX idx_archived_tasks_completed_at ON archived_tasks(completed_at)',
+]
+
+class Database:
+    def __init__(self, db_path='utils/tasks.db', pool_size=4, synchronous='NORMAL', busy_timeout_ms=5000, engine='file', persist_interval=5.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown storage engine: {engine}")
+        self.db_path = db_path
+        self.engine = engine
+        # One write connection and up to pool_size read connections, shared
+        # by all threads; see utils/connections.py
+        if engine == 'memory':
+            self.connections = MemoryConnectionPool(
+                db_path,
+                persist_interval=persist_interval,
+                busy_timeout_ms=busy_timeout_ms
             )
-        ''')
-        self.conn.commit()
+        else:
+            self.connections = ConnectionPool(
+                db_path,
+                pool_size=pool_size,
+                synchronous=synchronous,
+                busy_timeout_ms=busy_timeout_ms
+            )
+        # QueryStats while instrumentation is enabled, see enable_instrumentation
+        self.query_stats = None
+        logger.debug("Database initialized with path: %s (%s engine, journal mode %s)", self.db_path, engine, self.connections.journal_mode)
+    
+    def close(self):
+        # With the memory engine this also saves unsaved changes to the file
+        self.connections.close()
+        logger.debug("Database closed: %s", self.db_path)
+    
+    def persist(self):
+        # Saves the memory engine's changes to the file now rather than at
+        # the next interval; returns whether anything was saved. The file
+        # engine has nothing to save.
+        if self.engine != 'memory':
+            return False
+        return self.connections.persist()
+    
+    def _cursor(self, conn):
+        cursor = conn.cursor()
+        stats = self.query_stats
+        return cursor if stats is None else InstrumentedCursor(cursor, stats)
+    
+    @contextmanager
+    def reading(self):
+        # A cursor on a read connection, for one or more SELECTs. Results must
+        # be consumed before the block ends.
+        with self.connections.reader() as conn:
+            cursor = self._cursor(conn)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def writing(self):
+        # A cursor on the write connection inside a transaction, committed
+        # when the block ends and rolled back if it raises
+        with self.connections.transaction() as conn:
+            cursor = self._cursor(conn)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    def enable_instrumentation(self, slow_threshold_ms=100, slow_log_size=100):
+        # Records every statement run through reading() and writing(), on any
+        # thread, and the time spent decoding rows. Returns the QueryStats;
+        # snapshot() it to read them. While disabled the only cost is one
+        # check per query.
+        self.query_stats = QueryStats(slow_threshold_ms, slow_log_size)
+        return self.query_stats
+    
+    def disable_instrumentation(self):
+        self.query_stats = None
+    
+    def create_tasks_table(self, target_version=None):
+        # New databases get the current schema directly. target_version builds
+        # an older schema instead, by migrating up from the original table.
+        if target_version is None and self.create_schema():
+            return
+        with self.writing() as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    deadline TEXT,
+                    priority TEXT DEFAULT 'Low',
+                    status TEXT DEFAULT 'Pending'
+                )
+            ''')
+        self.migrate(target_version)
+    
+    def create_schema(self):
+        # Creates SCHEMA in an empty database. Returns False, changing
+        # nothing, if the database already has a tasks table.
+        self.get_schema_version()
+        with self.writing() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")
+            if cursor.fetchone():
+                return False
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.execute(
+                'INSERT INTO schema_version (version, applied_at) VALUES (?, ?)',
+                (SCHEMA_VERSION, datetime.now().isoformat(timespec='seconds'))
+            )
+        logger.info("Created database %s at schema version %s", self.db_path, SCHEMA_VERSION)
+        return True
+    
+    def get_schema_version(self):
+        with self.writing() as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    applied_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('SELECT MAX(version) FROM schema_version')
+            return cursor.fetchone()[0] or 0
+    
+    def migrate(self, target_version=None):
+        current = self.get_schema_version()
+        for version, statements in MIGRATIONS:
+            if version <= current or (target_version is not None and version > target_version):
+                continue
+            try:
+                # Each migration runs in its own transaction together with its
+                # version row, so an interrupted upgrade can simply be rerun
+                with self.writing() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        'INSERT INTO schema_version (version, applied_at) VALUES (?, ?)',
+                        (version, datetime.now().isoformat(timespec='seconds'))
+                    )
+                logger.info("Migrated database %s to schema version %s", self.db_path, version)
+            except sqlite3.Error as e:
+                logger.error("Failed to migrate database to schema version %s: %s", version, e)
+                raise
+    
+    def _task_values(self, task):
+        # completed_at is only given for imported tasks; otherwise a trigger
+        # sets it when a task is inserted as Completed
+        completed_at = task.completed_at.isoformat(timespec='seconds') if task.completed_at else None
+        return (task.title, task.description, deadline_to_ts(task.deadline), task.priority, task.status, completed_at)
+    
+    # Updates name the deadline 'deadline', as Task does; it is stored as
+    # deadline_ts
+    def _update_columns(self, keys):
+        return ['deadline_ts' if key == 'deadline' else key for key in keys]
+    
+    def _update_values(self, updated_data):
+        return [deadline_to_ts(value) if key == 'deadline' else value for key, value in updated_data.items()]
+    
+    def _last_task_id(self, cursor):
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='tasks'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
     
     def insert_task(self, task):
         try:
-            deadline = task.deadline.strftime('%Y-%m-%d') if task.deadline else None
-            self.cursor.execute('''
-                INSERT INTO tasks (title, description, deadline, priority, status)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (task.title, task.description, deadline, task.priority, task.status))
-            self.conn.commit()
-            logging.debug(f"Inserted task: {task.title}")
+            with self.writing() as cursor:
+                cursor.execute('''
+                    INSERT INTO tasks (title, description, deadline_ts, priority, status, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', self._task_values(task))
+                task_id = cursor.lastrowid
+            logger.debug("Inserted task: %s", task.title)
+            return task_id
         except sqlite3.Error as e:
-            logging.error(f"Error inserting task: {e}")
+            logger.error("Error inserting task: %s", e)
+            return None
     
     def update_task(self, task_id, updated_data):
         try:
-            fields = ', '.join(f"{key}=?" for key in updated_data.keys())
-            values = list(updated_data.values())
+            fields = ', '.join(f"{key}=?" for key in self._update_columns(updated_data))
+            values = self._update_values(updated_data)
             values.append(task_id)
             query = f"UPDATE tasks SET {fields} WHERE id=?"
-            self.cursor.execute(query, values)
-            self.conn.commit()
-            logging.debug(f"Task ID {task_id} updated with {updated_data}")
+            with self.writing() as cursor:
+                cursor.execute(query, values)
+            logger.debug("Task ID %s updated with %s", task_id, updated_data)
+            return True
         except sqlite3.Error as e:
-            logging.error(f"Failed to update task ID {task_id}: {e}")
+            logger.error("Failed to update task ID %s: %s", task_id, e)
+            return False
     
     def delete_task(self, task_id):
-        self.cursor.execute('DELETE FROM tasks WHERE id=?', (task_id,))
-        self.conn.commit()
+        with self.writing() as cursor:
+            cursor.execute('DELETE FROM tasks WHERE id=?', (task_id,))
     
-    def get_tasks_by_deadline(self, date):
-        self.cursor.execute('SELECT * FROM tasks WHERE deadline=?', (date.strftime('%Y-%m-%d'),))
-        rows = self.cursor.fetchall()
-        return [self.row_to_task(row) for row in rows]
+    # The bulk writers below consume their input lazily and run as a single
+    # transaction, so a large import costs one commit instead of one per row.
     
-    def get_tasks_by_priority(self, priority):
-        self.cursor.execute('SELECT * FROM tasks WHERE priority=?', (priority,))
-        rows = self.cursor.fetchall()
-        return [self.row_to_task(row) for row in rows]
+    def insert_tasks(self, tasks):
+        try:
+            # writing() takes the write lock up front (BEGIN IMMEDIATE), so the
+            # AUTOINCREMENT ids handed out by this transaction are contiguous
+            with self.writing() as cursor:
+                first_id = self._last_task_id(cursor) + 1
+                cursor.executemany('''
+                    INSERT INTO tasks (title, description, deadline_ts, priority, status, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (self._task_values(task) for task in tasks))
+                last_id = self._last_task_id(cursor)
+            logger.debug("Inserted %s tasks", last_id - first_id + 1)
+            return range(first_id, last_id + 1)
+        except sqlite3.Error as e:
+            logger.error("Error inserting tasks: %s", e)
+            return range(0)
     
-    def get_all_tasks(self):
-        self.cursor.execute('SELECT * FROM tasks')
-        rows = self.cursor.fetchall()
-        return [self.row_to_task(row) for row in rows]
+    def update_tasks(self, updates):
+        # Accepts {task_id: fields} or an iterable of (task_id, fields) pairs.
+        # Consecutive updates touching the same fields share one executemany.
+        items = updates.items() if isinstance(updates, dict) else updates
+        updated = 0
+        try:
+            with self.writing() as cursor:
+                for keys, group in groupby(items, key=lambda item: tuple(item[1].keys())):
+                    fields = ', '.join(f"{key}=?" for key in self._update_columns(keys))
+                    cursor.executemany(
+                        f"UPDATE tasks SET {fields} WHERE id=?",
+                        ((*self._update_values(updated_data), task_id) for task_id, updated_data in group)
+                    )
+                    updated += cursor.rowcount
+            logger.debug("Updated %s tasks", updated)
+        except sqlite3.Error as e:
+            logger.error("Failed to update tasks: %s", e)
+            updated = 0
+        return updated
+    
+    def delete_tasks(self, task_ids):
+        try:
+            with self.writing() as cursor:
+                cursor.executemany('DELETE FROM tasks WHERE id=?', ((task_id,) for task_id in task_ids))
+                deleted = cursor.rowcount
+            logger.debug("Deleted %s tasks", deleted)
+            return deleted
+        except sqlite3.Error as e:
+            logger.error("Error deleting tasks: %s", e)
+            return 0
+    
+    def get_tasks_by_deadline(self, date, as_batch=False):
+        # Tasks due at any time on the day of date
+        start, end = day_range_ts(date.date() if isinstance(date, datetime) else date)
+        with self.reading() as cursor:
+            cursor.execute(f'{SELECT_TASKS} WHERE deadline_ts >= ? AND deadline_ts < ? ORDER BY deadline_ts, id', (start, end))
+            return self.rows_to_tasks(cursor, as_batch)
+    
+    def get_tasks_due_between(self, start=None, end=None, status=None, as_batch=False):
+        # Tasks due in [start, end), earliest first. Either bound may be None
+        # for an open range; tasks without a deadline are never included. The
+        # range is a scan of idx_tasks_deadline_ts, or of
+        # idx_tasks_status_deadline_ts with a status.
+        query, params = self._due_between_sql(start, end, status)
+        with self.reading() as cursor:
+            cursor.execute(query, params)
+            return self.rows_to_tasks(cursor, as_batch)
+    
+    def iter_tasks_due_between(self, start=None, end=None, status=None, chunk_size=1000):
+        # get_tasks_due_between as a generator, chunk_size rows at a time,
+        # like iter_tasks
+        query, params = self._due_between_sql(start, end, status)
+        with self.reading() as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from self.rows_to_tasks(rows)
+    
+    def _due_between_sql(self, start=None, end=None, status=None):
+        conditions = ['deadline_ts IS NOT NULL']
+        params = []
+        if status is not None:
+            conditions.append('status=?')
+            params.append(status)
+        if start is not None:
+            conditions.append('deadline_ts >= ?')
+            params.append(deadline_to_ts(start))
+        if end is not None:
+            conditions.append('deadline_ts < ?')
+            params.append(deadline_to_ts(end))
+        return f"{SELECT_TASKS} WHERE {' AND '.join(conditions)} ORDER BY deadline_ts, id", params
+    
+    def get_tasks_by_priority(self, priority, as_batch=False):
+        with self.reading() as cursor:
+            cursor.execute(f'{SELECT_TASKS} WHERE priority=?', (priority,))
+            return self.rows_to_tasks(cursor, as_batch)
+    
+    def _filter_conditions(self, status=None, priority=None, due_before=None):
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append('status=?')
+            params.append(status)
+        if priority is not None:
+            conditions.append('priority=?')
+            params.append(priority)
+        if due_before is not None:
+            conditions.append('deadline_ts < ?')
+            params.append(deadline_to_ts(due_before))
+        return conditions, params
+    
+    def count_tasks(self, status=None, priority=None, due_before=None):
+        conditions, params = self._filter_conditions(status, priority, due_before)
+        query = 'SELECT COUNT(*) FROM tasks'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        with self.reading() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
+    
+    def query_tasks(self, status=None, priority=None, due_before=None, order_by='id', limit=None, after_key=None, offset=None, as_batch=False, before_key=None):
+        # Filters and sorting run in SQL. Pages are fetched with keyset
+        # pagination: pass page_key() of the last task of one page as
+        # after_key to get the next page, or of the first task as before_key
+        # to get the previous one (still in display order). offset is for
+        # random access, e.g. jumping to a scrollbar position.
+        query, params = self._query_sql(status, priority, due_before, order_by, limit, after_key, offset, before_key)
+        with self.reading() as cursor:
+            cursor.execute(query, params)
+            # before_key reads backwards from the key
+            rows = cursor.fetchall()[::-1] if before_key is not None else cursor
+            return self.rows_to_tasks(rows, as_batch)
+    
+    def iter_tasks(self, status=None, priority=None, due_before=None, order_by='id', limit=None, chunk_size=1000):
+        # The tasks query_tasks would return, as a generator that decodes
+        # chunk_size rows at a time, so a full scan only ever holds one chunk
+        # in memory. Keeps a read connection until the iteration ends or the
+        # generator is closed.
+        query, params = self._query_sql(status, priority, due_before, order_by, limit)
+        with self.reading() as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from self.rows_to_tasks(rows)
+    
+    def _query_sql(self, status=None, priority=None, due_before=None, order_by='id', limit=None, after_key=None, offset=None, before_key=None):
+        if order_by not in ORDER_KEYS:
+            raise ValueError(f"Unknown sort order: {order_by}")
+        if after_key is not None and before_key is not None:
+            raise ValueError("Pass after_key or before_key, not both")
+        sort_expr = ORDER_KEYS[order_by]
+        conditions, params = self._filter_conditions(status, priority, due_before)
+        key = after_key if after_key is not None else before_key
+        # Reading before a key walks the sort order backwards
+        backwards = (before_key is not None) != (order_by in DESCENDING_ORDERS)
+        op = '<' if backwards else '>'
+        direction = ' DESC' if backwards else ''
+        if key is not None:
+            if order_by == 'id':
+                conditions.append(f'id {op} ?')
+                params.append(key[-1])
+            else:
+                # Equivalent to (sort_expr, id) > key (or <), written so
+                # SQLite can seek the index to the start of the page
+                conditions.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR id {op} ?)")
+                params.extend((key[0], key[0], key[1]))
+        query = SELECT_TASKS
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        if order_by == 'id':
+            query += f' ORDER BY id{direction}'
+        else:
+            query += f" ORDER BY {sort_expr}{direction}, id{direction}"
+        if limit is not None or offset is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params.extend((-1 if limit is None else limit, offset or 0))
+        return query, params
+    
+    def page_key(self, task, order_by='id'):
+        # Python mirror of ORDER_KEYS for building after_key values
+        if order_by == 'deadline':
+            return (deadline_to_ts(task.deadline) if task.deadline else NO_DEADLINE, task.id)
+        if order_by == 'priority':
+            return (PRIORITY_RANKS.get(task.priority, 3), task.id)
+        if order_by == 'completed_at':
+            return (task.completed_at.isoformat(timespec='seconds') if task.completed_at else None, task.id)
+        return (task.id,)
+    
+    def search_tasks(self, query, limit=50, offset=0, status=None, priority=None, due_before=None, as_batch=False):
+        # Best matches first. Every word of query matches as a prefix, in
+        # either the title or the description.
+        match = fts_query(query)
+        if not match:
+            return TaskBatch() if as_batch else []
+        conditions, params = self._filter_conditions(status, priority, due_before)
+        columns = ', '.join(f'tasks.{column}' for column in TASK_COLUMNS)
+        sql = f'''
+            SELECT {columns} FROM tasks_fts
+            JOIN tasks ON tasks.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ?
+        '''
+        params.insert(0, match)
+        for condition in conditions:
+            sql += f" AND {condition}"
+        sql += f" ORDER BY bm25(tasks_fts, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]}) LIMIT ? OFFSET ?"
+        params.extend((limit, offset))
+        try:
+            with self.reading() as cursor:
+                cursor.execute(sql, params)
+                return self.rows_to_tasks(cursor, as_batch)
+        except sqlite3.Error as e:
+            logger.error("Error searching tasks for %r: %s", query, e)
+            return TaskBatch() if as_batch else []
+    
+    def get_task_by_id(self, task_id):
+        with self.reading() as cursor:
+            cursor.execute(f'{SELECT_TASKS} WHERE id=?', (task_id,))
+            row = cursor.fetchone()
+        return self.row_to_task(row) if row else None
+    
+    def get_all_tasks(self, as_batch=False):
+        with self.reading() as cursor:
+            cursor.execute(SELECT_TASKS)
+            return self.rows_to_tasks(cursor, as_batch)
+    
+    def iter_task_chunks(self, chunk_size=1000):
+        # Rows in id order, chunk_size at a time, for callers that stream the
+        # whole table, with the deadline as text. Holds one read connection
+        # until the iteration ends, all of it reading a single snapshot of
+        # the table.
+        with self.reading() as cursor:
+            cursor.execute(f'SELECT id, title, description, {DEADLINE_TEXT}, priority, status, completed_at FROM tasks ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+    
+    def rows_to_tasks(self, rows, as_batch=False):
+        # rows may be a cursor, which is then consumed without materialising
+        # every row. as_batch returns a column-oriented TaskBatch instead of a
+        # list of Task objects, for callers that scan many rows.
+        stats = self.query_stats
+        if stats is not None:
+            return self._timed_rows_to_tasks(rows, as_batch, stats)
+        if not as_batch:
+            return [self.row_to_task(row) for row in rows]
+        batch = TaskBatch()
+        for row in rows:
+            self._append_row(batch, row)
+        return batch
+    
+    def _timed_rows_to_tasks(self, rows, as_batch, stats):
+        # rows_to_tasks while instrumented: decoding is timed apart from
+        # fetching, which the cursor records against the statement
+        tasks = TaskBatch() if as_batch else []
+        elapsed = 0.0
+        for row in rows:
+            start = time.perf_counter()
+            if as_batch:
+                self._append_row(tasks, row)
+            else:
+                tasks.append(self.row_to_task(row))
+            elapsed += time.perf_counter() - start
+        stats.record_decode(len(tasks), elapsed)
+        return tasks
+    
+    def _append_row(self, batch, row):
+        batch.append(
+            row[0],
+            row[1],
+            row[2],
+            deadline_from_ts(row[3]) if row[3] is not None else None,
+            row[4],
+            row[5],
+            datetime.fromisoformat(row[6]) if len(row) > 6 and row[6] else None
+        )
     
     def row_to_task(self, row):
-        deadline = datetime.strptime(row[3], '%Y-%m-%d') if row[3] else None
+        deadline = deadline_from_ts(row[3]) if row[3] is not None else None
+        # completed_at is unique per task, so it bypasses deadline_from_ts's cache
+        completed_at = datetime.fromisoformat(row[6]) if len(row) > 6 and row[6] else None
         return Task(
             id=row[0],
             title=row[1],
             description=row[2],
             deadline=deadline,
             priority=row[4],
-            status=row[5]
-        ) 
+            status=row[5],
+            completed_at=completed_at
+        )
+    
+    def archive_completed_tasks(self, completed_before, limit=500):
+        # Moves up to limit tasks completed before completed_before from tasks
+        # to archived_tasks in one transaction and returns their ids. Callers
+        # repeat it until fewer than limit come back, so other writes get to
+        # run between batches.
+        cutoff = completed_before.isoformat(timespec='seconds')
+        try:
+            with self.writing() as cursor:
+                cursor.execute(
+                    "SELECT id FROM tasks WHERE status='Completed' AND completed_at < ? ORDER BY completed_at LIMIT ?",
+                    (cutoff, limit)
+                )
+                task_ids = [row[0] for row in cursor.fetchall()]
+                if task_ids:
+                    placeholders = ', '.join('?' * len(task_ids))
+                    cursor.execute(f'''
+                        INSERT INTO archived_tasks (id, title, description, deadline_ts, priority, status, completed_at, archived_at)
+                        SELECT id, title, description, deadline_ts, priority, status, completed_at, {LOCAL_NOW}
+                        FROM tasks WHERE id IN ({placeholders})
+                    ''', task_ids)
+                    cursor.execute(f'DELETE FROM tasks WHERE id IN ({placeholders})', task_ids)
+            if task_ids:
+                logger.debug("Archived %s tasks completed before %s", len(task_ids), cutoff)
+            return task_ids
+        except sqlite3.Error as e:
+            logger.error("Error archiving tasks: %s", e)
+            return []
+    
+    def count_archived_tasks(self):
+        with self.reading() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM archived_tasks')
+            return cursor.fetchone()[0]
+    
+    def query_archived_tasks(self, limit=None, offset=None):
+        # Most recently completed first
+        with self.reading() as cursor:
+            cursor.execute('''
+                SELECT id, title, description, deadline_ts, priority, status, completed_at
+                FROM archived_tasks ORDER BY completed_at DESC, id DESC LIMIT ? OFFSET ?
+            ''', (-1 if limit is None else limit, offset or 0))
+            return [self.row_to_task(row) for row in cursor]
+    
+    def count_by_priority(self, status=None):
+        conditions, params = self._filter_conditions(status=status)
+        query = 'SELECT priority, COUNT(*) FROM tasks'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        with self.reading() as cursor:
+            cursor.execute(query + ' GROUP BY priority', params)
+            return dict(cursor.fetchall())
+    
+    def count_by_status(self):
+        with self.reading() as cursor:
+            cursor.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status')
+            return dict(cursor.fetchall())
+    
+    def count_by_deadline_bucket(self, today, status='Pending'):
+        # Buckets match utils.stats.deadline_bucket: overdue, today, this_week
+        # (up to Sunday), later, or none when there is no deadline, by the
+        # local day a task is due on. The boundaries are local midnights, so
+        # each bucket is a range of deadline_ts.
+        today_start, tomorrow_start = day_range_ts(today)
+        week_end = day_start_ts(today + timedelta(days=7 - today.weekday()))
+        with self.reading() as cursor:
+            cursor.execute('''
+                SELECT CASE
+                    WHEN deadline_ts IS NULL THEN 'none'
+                    WHEN deadline_ts < ? THEN 'overdue'
+                    WHEN deadline_ts < ? THEN 'today'
+                    WHEN deadline_ts < ? THEN 'this_week'
+                    ELSE 'later'
+                END AS bucket, COUNT(*)
+                FROM tasks WHERE status=? GROUP BY bucket
+            ''', (today_start, tomorrow_start, week_end, status))
+            return dict(cursor.fetchall())
+    
+    def get_data_version(self):
+        # Read on the write connection, where it changes whenever another
+        # connection (another process, or another Database) commits to the
+        # file, but not for this Database's own writes. Returns None rather
+        # than waiting while this Database is in the middle of a write.
+        lock = self.connections.write_lock
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            return self.connections.writer.execute('PRAGMA data_version').fetchone()[0]
+        finally:
+            lock.release()
+    
+    def get_change_seq(self):
+        with self.reading() as cursor:
+            cursor.execute('SELECT MAX(seq) FROM task_changes')
+            return cursor.fetchone()[0] or 0
+    
+    def get_changes_since(self, seq):
+        with self.reading() as cursor:
+            cursor.execute('SELECT MIN(seq) FROM task_changes')
+            oldest = cursor.fetchone()[0]
+            if oldest is not None and oldest > seq + 1:
+                # Entries after seq have been pruned, so the caller must reload
+                return None
+            cursor.execute('SELECT seq, task_id, op FROM task_changes WHERE seq > ? ORDER BY seq', (seq,))
+            return cursor.fetchall()
     
     def clear_all_tasks(self):
         try:
-            self.cursor.execute('DELETE FROM tasks')
-            self.conn.commit()
-            logging.debug("All tasks cleared from database")
+            with self.writing() as cursor:
+                cursor.execute('DELETE FROM tasks')
+                cursor.execute('DELETE FROM archived_tasks')
+                # One 'clear' entry replaces the per-row delete entries
+                cursor.execute('DELETE FROM task_changes')
+                cursor.execute("INSERT INTO task_changes (task_id, op) VALUES (0, 'clear')")
+            logger.debug("All tasks cleared from database")
         except sqlite3.Error as e:
-            logging.error(f"Error clearing tasks: {e}")
\ No newline at end of file
+            logger.error("Error clearing tasks: %s", e)
+
+class ChangeFeed:
+    # Reports task changes made outside this process, or through another
+    # Database on the same file; writes made through the feed's own Database
+    # reach the controller's listeners instead. poll() is cheap when nothing
+    # changed: it only reads PRAGMA data_version.
+    def __init__(self, db):
+        self.db = db
+        self.seq = db.get_change_seq()
+        self.data_version = None
+        self.subscribers = []
+    
+    def subscribe(self, callback):
+        # Subscribers are called as callback(changes) with a list of
+        # (seq, task_id, op) tuples. An op of 'reset' means the changelog no
+        # longer covers what was missed and everything should be reloaded.
+        self.subscribers.append(callback)
+    
+    def poll(self):
+        version = self.db.get_data_version()
+        if version is None or version == self.data_version:
+            return []
+        self.data_version = version
+        changes = self.db.get_changes_since(self.seq)
+        if changes is None:
+            self.seq = self.db.get_change_seq()
+            changes = [(self.seq, None, 'reset')]
+        elif changes:
+            self.seq = changes[-1][0]
+        if changes:
+            for callback in list(self.subscribers):
+                callback(changes)
+        return changes
\ No newline at end of file
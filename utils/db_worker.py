@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+class DatabaseWorker:
+    # Runs database calls one at a time on a dedicated thread, so callers on
+    # the Tk thread never block on SQLite. submit() returns a Future.
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='db-worker', daemon=True)
+        self.thread.start()
+    
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self.requests.put((future, func, args, kwargs))
+        return future
+    
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            future, func, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+    
+    def stop(self, timeout=None):
+        self.requests.put(None)
+        self.thread.join(timeout)
+
+class TkDispatcher:
+    # Hands completed worker results back to the Tk thread. Tk widgets may only
+    # be touched from the thread running mainloop, so finished futures are
+    # queued and drained with after() while any request is outstanding.
+    def __init__(self, widget, worker, poll_ms=10):
+        self.widget = widget
+        self.worker = worker
+        self.poll_ms = poll_ms
+        self.completed = queue.Queue()
+        self.outstanding = 0
+        self.polling = False
+        # Seconds from submitting a request to the first idle point after its
+        # callback ran, i.e. after Tk has redrawn the result
+        self.latencies = deque(maxlen=1000)
+    
+    def call(self, func, *args, on_done=None, on_error=None, **kwargs):
+        started = time.perf_counter()
+        future = self.worker.submit(func, *args, **kwargs)
+        future.add_done_callback(lambda f: self.completed.put((f, on_done, on_error, started)))
+        self.outstanding += 1
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_ms, self.drain)
+        return future
+    
+    def drain(self):
+        while True:
+            try:
+                future, on_done, on_error, started = self.completed.get_nowait()
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            try:
+                error = future.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        logger.error("Database request failed: %r", error)
+                elif on_done:
+                    on_done(future.result())
+            except Exception:
+                # Keep draining; one failing callback must not stall the rest
+                logger.exception("Error in database callback")
+            self.widget.after_idle(self.record_latency, started)
+        if self.outstanding:
+            self.widget.after(self.poll_ms, self.drain)
+        else:
+            self.polling = False
+    
+    def record_latency(self, started):
+        self.latencies.append(time.perf_counter() - started)
+    
+    def latency_stats(self):
+        samples = sorted(self.latencies)
+        if not samples:
+            return {'count': 0}
+        return {
+            'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            'max_ms': samples[-1] * 1000
+        }
+
+def run_in_background(dispatcher, func, *args, on_done=None, on_error=None, **kwargs):
+    # Views call the database through this helper. Without a dispatcher the
+    # call runs inline, which keeps the views usable without a worker thread.
+    if dispatcher is not None:
+        return dispatcher.call(func, *args, on_done=on_done, on_error=on_error, **kwargs)
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        if on_error:
+            on_error(e)
+            return None
+        raise
+    if on_done:
+        on_done(result)
+    return result
\ No newline at end of file
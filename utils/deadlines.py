@@ -0,0 +1,58 @@
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+# Deadlines are stored as INTEGER seconds since the epoch, so the database
+# compares, sorts and range-scans them as plain integers. A deadline entered
+# as a date only is due at the end of that day, local time.
+END_OF_DAY = time(23, 59, 59)
+INPUT_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')
+INPUT_HINT = "YYYY-MM-DD or YYYY-MM-DD HH:MM"
+
+def parse_deadline_text(text):
+    # 'YYYY-MM-DD' means the end of that day; a time of day may follow
+    text = text.strip()
+    for fmt in INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return datetime.combine(datetime.strptime(text, '%Y-%m-%d').date(), END_OF_DAY)
+
+def parse_bound_text(text):
+    # A range bound rather than a deadline: 'YYYY-MM-DD' means the start of
+    # that day, so a range from one date to the next covers exactly that day
+    text = text.strip()
+    for fmt in INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(day_start_ts(datetime.strptime(text, '%Y-%m-%d').date()))
+
+def format_deadline(deadline, empty=''):
+    # Inverse of parse_deadline_text: end-of-day deadlines show as a date only
+    if deadline is None:
+        return empty
+    if deadline.time() == END_OF_DAY:
+        return deadline.strftime('%Y-%m-%d')
+    return deadline.strftime('%Y-%m-%d %H:%M')
+
+def deadline_to_ts(deadline):
+    # Local wall-clock datetime to epoch seconds, as stored in deadline_ts
+    if deadline is None:
+        return None
+    return int(deadline.timestamp())
+
+@lru_cache(maxsize=4096)
+def deadline_from_ts(ts):
+    # Deadlines repeat a lot across tasks, so each distinct value is converted
+    # once. The cached datetimes are immutable so sharing them is safe.
+    return datetime.fromtimestamp(ts)
+
+def day_start_ts(day):
+    # Epoch seconds of local midnight at the start of day (a date)
+    return int(datetime.combine(day, time()).timestamp())
+
+def day_range_ts(day):
+    # [start, end) of day in epoch seconds, for range queries on deadline_ts
+    return day_start_ts(day), day_start_ts(day + timedelta(days=1))
@@ -0,0 +1,60 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Queue mode's root handler and listener thread, while running
+_queue_handler = None
+_listener = None
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler formats each record on the logging thread before queueing
+    # it. Records stay in this process, so formatting is left to the listener
+    # thread as well.
+    def prepare(self, record):
+        return record
+
+def configure_logging(level=logging.INFO, use_queue=False, stream=None, filename=None):
+    # Called by the entry points; importing the application's modules never
+    # configures logging. Replaces any handlers on the root logger. With
+    # use_queue, log calls only put the record on a queue, and a background
+    # thread formats and writes it, so callers never wait on log I/O.
+    global _queue_handler, _listener
+    stop_logging()
+    if filename:
+        handler = logging.FileHandler(filename)
+    else:
+        handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    for old_handler in list(root.handlers):
+        root.removeHandler(old_handler)
+        old_handler.close()
+    root.setLevel(level)
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _DeferredQueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    else:
+        root.addHandler(handler)
+
+def stop_logging():
+    # Leaves queue mode: writes out any queued records, stops the listener
+    # thread and attaches its handler to the root logger directly, so later
+    # records are still written. Safe to call more than once.
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _queue_handler = None
+    _listener = None
@@ -1,30 +1,147 @@
+import heapq
 import threading
 import time
 from datetime import datetime, timedelta
+from utils.deadlines import format_deadline
+
+# Longest the scheduler sleeps before checking for changes made by other
+# processes
+CHANGE_POLL_INTERVAL = 5
+# How long before a task's deadline its reminder fires
+REMINDER_LEAD = timedelta(minutes=30)
 
 class NotificationManager:
     def __init__(self, task_controller):
         self.task_controller = task_controller
         self.running = False
+        self.condition = threading.Condition()
+        # Min-heap of (fire_time, task_id). Entries are removed lazily: an entry
+        # is live only while scheduled[task_id] still holds its fire_time.
+        self.heap = []
+        self.scheduled = {}
+        self.dirty = set()
+        self.reload_all = False
+        self.task_controller.add_listener(self.on_task_changed)
     
     def schedule_notification(self, task):
-        if task.deadline:
-            notification_time = task.deadline - timedelta(minutes=30)  # 30 minutes before deadline
-            delay = (notification_time - datetime.now()).total_seconds()
-            if delay > 0:
-                threading.Timer(delay, self.notify, args=(task,)).start()
+        with self.condition:
+            self.scheduled.pop(task.id, None)
+            if task.deadline and task.status == 'Pending':
+                fire_time = task.deadline.timestamp() - REMINDER_LEAD.total_seconds()
+                if fire_time > time.time():
+                    self.scheduled[task.id] = fire_time
+                    heapq.heappush(self.heap, (fire_time, task.id))
+                    self._compact()
+            self.condition.notify()
+    
+    def cancel_notification(self, task_id):
+        with self.condition:
+            if self.scheduled.pop(task_id, None) is not None:
+                self._compact()
+                self.condition.notify()
+    
+    def _compact(self):
+        # Drop stale entries once they outnumber the live ones so the heap
+        # stays proportional to the number of pending reminders
+        if len(self.heap) > 2 * len(self.scheduled) + 64:
+            self.heap = [entry for entry in self.heap if self.scheduled.get(entry[1]) == entry[0]]
+            heapq.heapify(self.heap)
+    
+    def on_task_changed(self, op, task_ids):
+        # Runs on the writer's thread, so only record what changed and let the
+        # scheduler thread reload the affected tasks
+        with self.condition:
+            if op == 'clear':
+                self.heap = []
+                self.scheduled.clear()
+                self.dirty.clear()
+            elif op == 'delete':
+                for task_id in task_ids:
+                    self.scheduled.pop(task_id, None)
+                    self.dirty.discard(task_id)
+                self._compact()
+            else:
+                self.dirty.update(task_ids)
+            self.condition.notify()
     
     def notify(self, task):
-        print(f"Reminder: Task '{task.title}' is due at {task.deadline}")
+        print(f"Reminder: Task '{task.title}' is due at {format_deadline(task.deadline)}")
+    
+    def on_external_changes(self, changes):
+        for seq, task_id, op in changes:
+            if op in ('reset', 'clear'):
+                with self.condition:
+                    self.reload_all = True
+            elif op == 'delete':
+                self.on_task_changed('delete', [task_id])
+            else:
+                self.on_task_changed(op, [task_id])
+    
+    def load_pending_tasks(self):
+        with self.condition:
+            self.heap = []
+            self.scheduled.clear()
+            self.reload_all = False
+        # Only tasks whose reminder is still ahead; an index range scan,
+        # streamed so a large table is never loaded at once
+        for task in self.task_controller.iter_tasks_due_between(datetime.now() + REMINDER_LEAD, status='Pending'):
+            self.schedule_notification(task)
     
     def run_scheduler(self):
         self.running = True
+        # The feed is created here so that it is polled from this thread
+        change_feed = self.task_controller.create_change_feed()
+        change_feed.subscribe(self.on_external_changes)
+        self.load_pending_tasks()
         while self.running:
-            tasks = self.task_controller.get_all_tasks()
-            for task in tasks:
-                if task.status == 'Pending':
-                    self.schedule_notification(task)
-            time.sleep(60)  # Check every minute
+            self.run_cycle(change_feed)
+            self._wait_for_next()
+    
+    def run_cycle(self, change_feed):
+        # One pass of the scheduler: apply changes, then send due reminders
+        change_feed.poll()
+        if self.reload_all:
+            self.load_pending_tasks()
+        for task_id in self._take_dirty():
+            task = self.task_controller.get_task_by_id(task_id)
+            if task:
+                self.schedule_notification(task)
+            else:
+                self.cancel_notification(task_id)
+        for task_id in self._pop_due():
+            task = self.task_controller.get_task_by_id(task_id)
+            if task and task.status == 'Pending':
+                self.notify(task)
+    
+    def _take_dirty(self):
+        with self.condition:
+            dirty = self.dirty
+            self.dirty = set()
+        return dirty
+    
+    def _pop_due(self):
+        due = []
+        now = time.time()
+        with self.condition:
+            while self.heap and self.heap[0][0] <= now:
+                fire_time, task_id = heapq.heappop(self.heap)
+                if self.scheduled.get(task_id) == fire_time:
+                    del self.scheduled[task_id]
+                    due.append(task_id)
+        return due
+    
+    def _wait_for_next(self):
+        with self.condition:
+            if not self.running or self.dirty:
+                return
+            timeout = CHANGE_POLL_INTERVAL
+            if self.heap:
+                timeout = min(timeout, self.heap[0][0] - time.time())
+            if timeout > 0:
+                self.condition.wait(timeout)
     
     def stop_scheduler(self):
-        self.running = False 
\ No newline at end of file
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.task_controller.remove_listener(self.on_task_changed)
\ No newline at end of file
@@ -0,0 +1,199 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    return ' '.join(sql.split())
+
+class StatementStats:
+    __slots__ = ('calls', 'total', 'max', 'rows', 'buckets')
+    
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+class QueryStats:
+    # Per-statement counts, latency histograms and rows returned for a
+    # Database, plus a ring buffer of the slowest recent executions. A
+    # statement's latency covers its execute call and fetching its rows.
+    def __init__(self, slow_threshold_ms=100, slow_log_size=100):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.lock = threading.Lock()
+        self.statements = {}
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.decode_rows = 0
+        self.decode_time = 0.0
+    
+    def record(self, method, sql, params, elapsed, rows):
+        key = (method, normalize_sql(sql))
+        with self.lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                entry = self.statements[key] = StatementStats()
+            entry.calls += 1
+            entry.total += elapsed
+            entry.rows += rows
+            if elapsed > entry.max:
+                entry.max = elapsed
+            entry.buckets[bisect_left(LATENCY_BUCKETS, elapsed * 1000)] += 1
+            if elapsed >= self.slow_threshold:
+                self.slow_log.append({
+                    'at': datetime.now().isoformat(timespec='milliseconds'),
+                    'method': method,
+                    'sql': key[1],
+                    'params': repr(params)[:200],
+                    'ms': elapsed * 1000,
+                    'rows': rows
+                })
+    
+    def record_decode(self, rows, elapsed):
+        # Time spent turning rows into Task objects or a TaskBatch
+        with self.lock:
+            self.decode_rows += rows
+            self.decode_time += elapsed
+    
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+            self.slow_log.clear()
+            self.decode_rows = 0
+            self.decode_time = 0.0
+    
+    def snapshot(self):
+        with self.lock:
+            statements = [
+                {
+                    'method': method,
+                    'sql': sql,
+                    'calls': entry.calls,
+                    'rows': entry.rows,
+                    'total_ms': entry.total * 1000,
+                    'mean_ms': entry.total / entry.calls * 1000,
+                    'max_ms': entry.max * 1000,
+                    'histogram': {
+                        (f'<={bound}ms' if bound is not None else f'>{LATENCY_BUCKETS[-1]}ms'): count
+                        for bound, count in zip(LATENCY_BUCKETS + (None,), entry.buckets)
+                        if count
+                    }
+                }
+                for (method, sql), entry in self.statements.items()
+            ]
+            statements.sort(key=lambda item: item['total_ms'], reverse=True)
+            return {
+                'statements': statements,
+                'decode': {'rows': self.decode_rows, 'total_ms': self.decode_time * 1000},
+                'slow_queries': list(self.slow_log)
+            }
+
+def format_query_stats(snapshot, limit=15):
+    lines = [f"{'calls':>8}{'total ms':>11}{'mean ms':>10}{'max ms':>10}{'rows':>10}  method: statement"]
+    for item in snapshot['statements'][:limit]:
+        lines.append(
+            f"{item['calls']:>8}{item['total_ms']:>11.1f}{item['mean_ms']:>10.3f}{item['max_ms']:>10.2f}"
+            f"{item['rows']:>10}  {item['method']}: {item['sql'][:100]}"
+        )
+    decode = snapshot['decode']
+    lines.append(f"row decoding: {decode['rows']} rows in {decode['total_ms']:.1f} ms")
+    if snapshot['slow_queries']:
+        lines.append("slow queries:")
+        for entry in snapshot['slow_queries'][-limit:]:
+            lines.append(f"  {entry['at']} {entry['ms']:.1f} ms {entry['method']}: {entry['sql'][:100]} {entry['params']}")
+    return '\n'.join(lines)
+
+class InstrumentedCursor:
+    # Wraps a sqlite3 cursor and reports each execution to a QueryStats. An
+    # execution is recorded once its rows have been fetched: after fetchall,
+    # fetchone or fetchmany, at the end of iteration, or when the cursor runs
+    # its next statement or is closed. Anything else is passed through to the
+    # cursor.
+    def __init__(self, cursor, stats):
+        self.cursor = cursor
+        self.stats = stats
+        self.pending = None
+    
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+    
+    def _finish(self):
+        pending = self.pending
+        if pending is not None:
+            self.pending = None
+            method, sql, params, elapsed, rows = pending
+            # Statements that return nothing count the rows they changed
+            self.stats.record(method, sql, params, elapsed, rows or max(self.cursor.rowcount, 0))
+    
+    def _run(self, call, sql, params):
+        self._finish()
+        # Two frames up is the Database method that ran the statement
+        self.pending = [sys._getframe(2).f_code.co_name, sql, params, 0.0, 0]
+        start = time.perf_counter()
+        try:
+            call(sql, params)
+        finally:
+            self.pending[3] += time.perf_counter() - start
+        return self
+    
+    def execute(self, sql, params=()):
+        return self._run(self.cursor.execute, sql, params)
+    
+    def close(self):
+        self._finish()
+        self.cursor.close()
+    
+    def executemany(self, sql, params):
+        self._run(self.cursor.executemany, sql, params)
+        self._finish()
+        return self
+    
+    def _fetched(self, start, rows):
+        if self.pending is not None:
+            self.pending[3] += time.perf_counter() - start
+            self.pending[4] += rows
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self.cursor.fetchone()
+        self._fetched(start, row is not None)
+        self._finish()
+        return row
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self._fetched(start, len(rows))
+        self._finish()
+        return rows
+    
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        size = size or self.cursor.arraysize
+        rows = self.cursor.fetchmany(size)
+        self._fetched(start, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = next(self.cursor)
+        except StopIteration:
+            self._fetched(start, 0)
+            self._finish()
+            raise
+        self._fetched(start, 1)
+        return row
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+class ResultCache:
+    # Bounded LRU of query results keyed by (query, parameters). Every entry
+    # is stamped with the write generation it was read at; bump() starts a
+    # new generation, which makes every older entry stale at once without
+    # walking them. Staleness is checked on lookup, and stale entries are
+    # dropped then.
+    #
+    # The cap is on the number of tasks held across all entries, so one huge
+    # get_all_tasks() can't pin the memory of the whole table: a result
+    # larger than max_tasks is returned but never stored.
+    def __init__(self, max_entries=128, max_tasks=100_000, enabled=True):
+        self.max_entries = max_entries
+        self.max_tasks = max_tasks
+        self.enabled = enabled
+        self.generation = 0
+        # key -> (generation, result, size), least recently used first
+        self._entries = OrderedDict()
+        self._tasks = 0
+        self._data_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def bump(self):
+        # Call after a write has committed. A load that was running across
+        # the bump is not stored, since it may have read the old rows.
+        with self._lock:
+            self.generation += 1
+    
+    def observe_data_version(self, version):
+        # Bumps when PRAGMA data_version shows another connection committed
+        # since the last call. None (unknown) is ignored.
+        if version is None:
+            return
+        with self._lock:
+            if self._data_version is not None and version != self._data_version:
+                self.generation += 1
+            self._data_version = version
+    
+    def get_or_load(self, key, load):
+        if not self.enabled:
+            return load()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == self.generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+            generation = self.generation
+        result = load()
+        size = len(result) if hasattr(result, '__len__') else 1
+        with self._lock:
+            if generation == self.generation and size <= self.max_tasks:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (generation, result, size)
+                self._tasks += size
+                while len(self._entries) > self.max_entries or self._tasks > self.max_tasks:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return result
+    
+    def _remove(self, key):
+        self._tasks -= self._entries.pop(key)[2]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tasks = 0
+            self.generation += 1
+    
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'tasks': self._tasks,
+                'generation': self.generation
+            }
@@ -0,0 +1,77 @@
+from collections import Counter
+from datetime import timedelta
+
+PRIORITIES = ('High', 'Medium', 'Low')
+STATUSES = ('Pending', 'Completed')
+DEADLINE_BUCKETS = ('overdue', 'today', 'this_week', 'later', 'none')
+
+def deadline_bucket(deadline, today):
+    # Python mirror of Database.count_by_deadline_bucket
+    if deadline is None:
+        return 'none'
+    day = deadline.date()
+    if day < today:
+        return 'overdue'
+    if day == today:
+        return 'today'
+    if day <= today + timedelta(days=6 - today.weekday()):
+        return 'this_week'
+    return 'later'
+
+class TaskStats:
+    # Task counts by priority, by status and, for pending tasks, by deadline
+    # bucket. Loaded once with GROUP BY queries and then adjusted per write,
+    # so reading them is O(1) however many tasks there are. version changes
+    # whenever the counts do.
+    def __init__(self):
+        self.priority = Counter()
+        self.status = Counter()
+        self.deadline = Counter()
+        self.day = None
+        self.loaded = False
+        self.version = 0
+    
+    def load(self, db, today):
+        self.priority = Counter(db.count_by_priority())
+        self.status = Counter(db.count_by_status())
+        self.deadline = Counter(db.count_by_deadline_bucket(today))
+        self.day = today
+        self.loaded = True
+        self.version += 1
+    
+    def reset(self, today):
+        # All tasks were removed
+        self.priority.clear()
+        self.status.clear()
+        self.deadline.clear()
+        self.day = today
+        self.loaded = True
+        self.version += 1
+    
+    def invalidate(self):
+        # Counts can't be adjusted, e.g. after a bulk or external write; they
+        # are reloaded on the next read
+        self.loaded = False
+        self.version += 1
+    
+    def _apply(self, task, delta):
+        self.priority[task.priority] += delta
+        self.status[task.status] += delta
+        if task.status == 'Pending':
+            self.deadline[deadline_bucket(task.deadline, self.day)] += delta
+    
+    def replace(self, old_task, new_task):
+        if not self.loaded:
+            return
+        if old_task is not None:
+            self._apply(old_task, -1)
+        if new_task is not None:
+            self._apply(new_task, 1)
+        self.version += 1
+    
+    def snapshot(self):
+        return {
+            'priority': {key: self.priority.get(key, 0) for key in PRIORITIES},
+            'status': {key: self.status.get(key, 0) for key in STATUSES},
+            'deadline': {key: self.deadline.get(key, 0) for key in DEADLINE_BUCKETS}
+        }
\ No newline at end of file
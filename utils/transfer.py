@@ -0,0 +1,103 @@
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from models.task_model import Task
+from utils.deadlines import parse_deadline_text
+
+logger = logging.getLogger(__name__)
+
+# Columns written by exports, in order. Imports ignore id, since ids from
+# another database would collide with the tasks already here.
+FIELDS = ('id', 'title', 'description', 'deadline', 'priority', 'status', 'completed_at')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+# Rows per fetchmany() on export and per transaction on import
+CHUNK_SIZE = 5000
+
+def transfer_format(path, fmt=None):
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown task file format for {path}; use .csv or .jsonl")
+    return fmt
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def write_tasks(chunks, path, fmt=None, progress=None):
+    # chunks is an iterable of lists of task rows, e.g.
+    # Database.iter_task_chunks(). Only one chunk is held at a time.
+    fmt = transfer_format(path, fmt)
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            write = writer.writerows
+        else:
+            def write(rows):
+                f.writelines(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n' for row in rows)
+        for rows in chunks:
+            write(rows)
+            written += len(rows)
+            if progress:
+                progress(written)
+    return written
+
+def _records(f, fmt):
+    # Yields (line_number, record) pairs, reading one line at a time. JSONL
+    # records are returned undecoded so a bad line can be skipped.
+    if fmt == 'csv':
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, line
+
+def _record_to_task(record):
+    if isinstance(record, str):
+        record = json.loads(record)
+    title = (record.get('title') or '').strip()
+    if not title:
+        raise ValueError("missing title")
+    deadline = record.get('deadline') or None
+    status = record.get('status') or 'Pending'
+    # Files exported before completed_at was added have none; the database
+    # then stamps completed tasks with the import time
+    completed_at = record.get('completed_at') or None
+    return Task(
+        id=None,
+        title=title,
+        description=record.get('description') or '',
+        deadline=parse_deadline_text(deadline) if deadline else None,
+        priority=record.get('priority') or 'Low',
+        status=status,
+        completed_at=datetime.fromisoformat(completed_at) if completed_at and status == 'Completed' else None
+    )
+
+def read_tasks(path, fmt=None, with_lines=False):
+    # Yields a Task per valid record of a CSV or JSONL file, or with
+    # with_lines a (line_number, task) pair. Invalid records are logged and
+    # skipped so one bad line does not abort a large import.
+    fmt = transfer_format(path, fmt)
+    skipped = 0
+    with open(path, newline='', encoding='utf-8') as f:
+        for line_number, record in _records(f, fmt):
+            try:
+                task = _record_to_task(record)
+            except (ValueError, TypeError, AttributeError) as e:
+                skipped += 1
+                logger.error("Skipping %s line %s: %s", path, line_number, e)
+                continue
+            yield (line_number, task) if with_lines else task
+    if skipped:
+        logger.warning("Skipped %s invalid records in %s", skipped, path)
@@ -1,24 +1,88 @@
 import tkinter as tk
 from tkinter import ttk
+from utils.db_worker import run_in_background
+
+# How often the chart checks whether any task changed
+CHANGE_POLL_MS = 2000
+# How often the chart checks the controller's stats version, which costs no
+# database access
+STATS_POLL_MS = 250
+
+SECTIONS = [
+    ('Priority', 'priority', ['High', 'Medium', 'Low']),
+    ('Status', 'status', ['Pending', 'Completed']),
+    ('Deadline', 'deadline', ['overdue', 'today', 'this_week', 'later', 'none'])
+]
 
 class Visualization:
-    def __init__(self, parent, task_controller):
+    def __init__(self, parent, task_controller, dispatcher=None):
         self.parent = parent
         self.task_controller = task_controller
+        self.dispatcher = dispatcher
+        self.shown_version = None
+        self.loading = False
         self.create_widgets()
+        # The feed is created and polled on the worker thread, like the GUI's
+        self.change_feed = None
+        run_in_background(self.dispatcher, self.task_controller.create_change_feed, on_done=self.start_change_polling)
+        self.parent.after(STATS_POLL_MS, self.poll_stats)
     
     def create_widgets(self):
-        self.tree = ttk.Treeview(self.parent, columns=('Priority', 'Count'), show='headings')
-        self.tree.heading('Priority', text='Priority')
+        self.tree = ttk.Treeview(self.parent, columns=('Group', 'Count'), show='tree headings')
+        self.tree.heading('#0', text='')
+        self.tree.heading('Group', text='Group')
         self.tree.heading('Count', text='Count')
+        self.tree.column('#0', width=90)
+        # Rows are created once and only their counts change afterwards
+        for title, section, keys in SECTIONS:
+            self.tree.insert('', tk.END, iid=section, text=title, open=True)
+            for key in keys:
+                self.tree.insert(section, tk.END, iid=f'{section}:{key}', values=(key.replace('_', ' '), 0))
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.generate_progress_chart()
     
+    def start_change_polling(self, change_feed):
+        self.change_feed = change_feed
+        self.parent.after(CHANGE_POLL_MS, self.poll_changes)
+    
+    def poll_changes(self):
+        # Changes made by other processes invalidate the controller's stats,
+        # which poll_stats then picks up
+        run_in_background(
+            self.dispatcher,
+            self.change_feed.poll,
+            on_done=self.on_changes,
+            on_error=self.on_changes
+        )
+    
+    def on_changes(self, result):
+        self.parent.after(CHANGE_POLL_MS, self.poll_changes)
+    
+    def poll_stats(self):
+        if self.task_controller.stats_version != self.shown_version:
+            self.generate_progress_chart()
+        self.parent.after(STATS_POLL_MS, self.poll_stats)
+    
     def generate_progress_chart(self):
-        tasks = self.task_controller.get_all_tasks()
-        priority_count = {'High':0, 'Medium':0, 'Low':0}
-        for task in tasks:
-            if task.priority in priority_count:
-                priority_count[task.priority] += 1
-        for priority, count in priority_count.items():
-            self.tree.insert('', tk.END, values=(priority, count)) 
\ No newline at end of file
+        if self.loading:
+            return
+        self.loading = True
+        
+        def fetch():
+            stats = self.task_controller.get_stats()
+            return self.task_controller.stats_version, stats
+        
+        def loaded(result):
+            self.loading = False
+            self.shown_version, stats = result
+            self.show_stats(stats)
+        
+        def failed(error):
+            self.loading = False
+        
+        run_in_background(self.dispatcher, fetch, on_done=loaded, on_error=failed)
+    
+    def show_stats(self, stats):
+        for title, section, keys in SECTIONS:
+            for key in keys:
+                self.tree.set(f'{section}:{key}', 'Count', stats[section][key])
\ No newline at end of file
@@ -1,15 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
 import logging
+from utils.db_worker import run_in_background
+from utils.deadlines import INPUT_HINT, format_deadline, parse_deadline_text
 
 class EditTaskForm(tk.Frame):
-    def __init__(self, parent, task_controller, task, on_task_updated=None):
+    def __init__(self, parent, task_controller, task, on_task_updated=None, dispatcher=None):
         super().__init__(parent)
         self.parent = parent
         self.task_controller = task_controller
         self.task = task
         self.on_task_updated = on_task_updated
+        self.dispatcher = dispatcher
         self.configure(bg='white')
         self.create_widgets()
     
@@ -27,10 +29,10 @@ class EditTaskForm(tk.Frame):
         self.description_entry.insert(0, self.task.description)
         
         # Deadline
-        tk.Label(self, text="Deadline (YYYY-MM-DD):", bg='white',fg='black').grid(row=2, column=0, padx=10, pady=10, sticky='e')
+        tk.Label(self, text=f"Deadline ({INPUT_HINT}):", bg='white',fg='black').grid(row=2, column=0, padx=10, pady=10, sticky='e')
         self.deadline_entry = tk.Entry(self, width=40)
         self.deadline_entry.grid(row=2, column=1, padx=10, pady=10)
-        deadline_str = self.task.deadline.strftime('%Y-%m-%d') if self.task.deadline else ''
+        deadline_str = format_deadline(self.task.deadline)
         self.deadline_entry.insert(0, deadline_str)
         
         # Priority
@@ -62,11 +64,11 @@ class EditTaskForm(tk.Frame):
         deadline = None
         if deadline_str:
             try:
-                deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
+                deadline = parse_deadline_text(deadline_str)
             except ValueError:
                 messagebox.showerror(
                     "Invalid Date",
-                    "Please enter the deadline in YYYY-MM-DD format.\nExample: 2024-12-31"
+                    f"Please enter the deadline as {INPUT_HINT}.\nExample: 2024-12-31 or 2024-12-31 17:00"
                 )
                 return
         
@@ -78,8 +80,16 @@ class EditTaskForm(tk.Frame):
             'status': status
         }
         
-        self.task_controller.edit_task(self.task.id, updated_data)
-        
+        run_in_background(
+            self.dispatcher,
+            self.task_controller.edit_task,
+            self.task.id,
+            updated_data,
+            on_done=self.on_task_saved,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not update task: {e}")
+        )
+    
+    def on_task_saved(self, result):
         if self.on_task_updated:
             self.on_task_updated()
         
@@ -4,6 +4,9 @@ from controllers.task_controller import TaskController
 from views.task_form import TaskForm
 from views.task_view import TaskView
 from views.edit_task_form import EditTaskForm
+from views.refresh_scheduler import RefreshScheduler
+from utils.db_worker import DatabaseWorker, TkDispatcher, run_in_background
+from utils.deadlines import format_deadline
 
 class MainWindow(tk.Tk):
     def __init__(self):
@@ -13,12 +16,21 @@ class MainWindow(tk.Tk):
         
         # Initialize Controllers
         self.task_controller = TaskController()
+        self.db_worker = DatabaseWorker()
+        self.dispatcher = TkDispatcher(self, self.db_worker)
+        self.refresh_scheduler = RefreshScheduler(self)
         
         # Set up menu
         self.create_menu()
         
         # Initialize Task View
-        self.task_view = TaskView(self, self.task_controller, self.show_overlay)
+        self.task_view = TaskView(
+            self,
+            self.task_controller,
+            self.show_overlay,
+            dispatcher=self.dispatcher,
+            refresh_scheduler=self.refresh_scheduler
+        )
         self.task_view.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
         # Initialize Task Form
@@ -26,7 +38,8 @@ class MainWindow(tk.Tk):
             self, 
             self.task_controller, 
             show_overlay=self.show_overlay, 
-            on_task_added=self.task_view.refresh_tasks
+            on_task_added=self.task_view.refresh_tasks,
+            dispatcher=self.dispatcher
         )
         self.task_form.pack(side=tk.TOP, fill=tk.X)
         
@@ -100,27 +113,45 @@ class MainWindow(tk.Tk):
         return selected
 
     def edit_task(self):
-        selected_task = self.get_selected_task()
+        task_id = self.task_view.get_selected_task_id()
+        if task_id is not None:
+            run_in_background(
+                self.dispatcher,
+                self.task_controller.get_task_by_id,
+                task_id,
+                on_done=self.open_edit_form
+            )
+        else:
+            messagebox.showwarning("No Selection", "edit this.")
+    
+    def open_edit_form(self, selected_task):
         if selected_task:
             task_data = (
                 selected_task.id,
                 selected_task.title,
                 selected_task.description,
-                selected_task.deadline.strftime('%Y-%m-%d') if selected_task.deadline else '',
+                format_deadline(selected_task.deadline),
                 selected_task.priority,
                 selected_task.status
             )
-            self.show_overlay(EditTaskForm, task_data, on_task_updated=self.task_view.refresh_tasks)
-        else:
-            messagebox.showwarning("No Selection", "edit this.")
+            self.show_overlay(
+                EditTaskForm,
+                task_data,
+                on_task_updated=self.task_view.refresh_tasks,
+                dispatcher=self.dispatcher
+            )
 
     def delete_task(self):
-        selected_task = self.get_selected_task()
-        if selected_task:
+        task_id = self.task_view.get_selected_task_id()
+        if task_id is not None:
             confirm = messagebox.askyesno("Delete Task", "Are you sure you want to delete this task?")
             if confirm:
-                self.task_controller.delete_task(selected_task.id)
-                self.task_view.refresh_tasks()
+                run_in_background(
+                    self.dispatcher,
+                    self.task_controller.delete_task,
+                    task_id,
+                    on_done=lambda result: self.task_view.refresh_tasks()
+                )
         else:
             messagebox.showwarning("No Selection", "Please select a task to delete.")
 
@@ -147,9 +178,13 @@ class MainWindow(tk.Tk):
         self.overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
 
     def mark_task_complete(self):
-        selected_task = self.get_selected_task()
-        if selected_task:
-            self.task_controller.mark_task_complete(selected_task.id)
-            self.task_view.refresh_tasks()
+        task_id = self.task_view.get_selected_task_id()
+        if task_id is not None:
+            run_in_background(
+                self.dispatcher,
+                self.task_controller.mark_task_complete,
+                task_id,
+                on_done=lambda result: self.task_view.refresh_tasks()
+            )
         else:
             messagebox.showwarning("No Selection", "Please select a task to mark as complete.")
\ No newline at end of file
@@ -0,0 +1,63 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Most redraws per second; requests in between are merged into the next one
+MAX_REFRESHES_PER_SECOND = 10
+
+class RefreshScheduler:
+    # Merges refresh requests from the views into one flush per frame. Each
+    # refresh callback runs at most once per flush however often it was
+    # requested, so a burst of writes (a bulk import, a change feed delivering
+    # hundreds of updates) costs one redraw per list rather than one per
+    # write. Flushes run at idle, and no sooner than 1/max_per_second after
+    # the previous one.
+    def __init__(self, widget, max_per_second=MAX_REFRESHES_PER_SECOND):
+        self.widget = widget
+        self.min_interval = 1.0 / max_per_second
+        # Callbacks waiting for the next flush, in request order
+        self.pending = {}
+        self.job = None
+        self.last_flush = float('-inf')
+        self.requested = 0
+        self.performed = 0
+        self.flushes = 0
+    
+    def request(self, callback):
+        self.requested += 1
+        self.pending[callback] = None
+        if self.job is None:
+            delay = self.last_flush + self.min_interval - time.monotonic()
+            if delay > 0:
+                self.job = self.widget.after(max(1, int(delay * 1000)), self.flush)
+            else:
+                self.job = self.widget.after_idle(self.flush)
+    
+    def flush(self):
+        self.job = None
+        callbacks = list(self.pending)
+        self.pending.clear()
+        self.last_flush = time.monotonic()
+        self.flushes += 1
+        for callback in callbacks:
+            self.performed += 1
+            try:
+                callback()
+            except Exception:
+                # One failing view must not keep the others stale
+                logger.exception("Error in refresh callback")
+    
+    def cancel(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        self.pending.clear()
+    
+    def stats(self):
+        return {
+            'requested': self.requested,
+            'performed': self.performed,
+            'coalesced': self.requested - self.performed - len(self.pending),
+            'flushes': self.flushes
+        }
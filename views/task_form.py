@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
+from utils.db_worker import run_in_background
+from utils.deadlines import INPUT_HINT, parse_deadline_text
 
 class TaskForm(tk.Frame):
-    def __init__(self, parent, task_controller, on_task_added=None):
+    def __init__(self, parent, task_controller, on_task_added=None, dispatcher=None):
         super().__init__(parent)
         self.parent = parent
         self.task_controller = task_controller
         self.on_task_added = on_task_added
+        self.dispatcher = dispatcher
         self.configure(bg='#f0f0f0')
         self.create_widgets()
     
@@ -23,7 +25,7 @@ class TaskForm(tk.Frame):
         self.description_entry.grid(row=1, column=1, padx=5, pady=5)
         
         # Deadline
-        tk.Label(self, text="Deadline (YYYY-MM-DD):", bg='#f0f0f0',fg='black').grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        tk.Label(self, text=f"Deadline ({INPUT_HINT}):", bg='#f0f0f0',fg='black').grid(row=2, column=0, padx=5, pady=5, sticky='e')
         self.deadline_entry = tk.Entry(self, width=50)
         self.deadline_entry.grid(row=2, column=1, padx=5, pady=5)
         
@@ -55,11 +57,11 @@ class TaskForm(tk.Frame):
         deadline = None
         if deadline_str:
             try:
-                deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
+                deadline = parse_deadline_text(deadline_str)
             except ValueError:
                 messagebox.showerror(
                     "Invalid Date", 
-                    "Please enter the deadline in YYYY-MM-DD format.\nExample: 2024-12-31"
+                    f"Please enter the deadline as {INPUT_HINT}.\nExample: 2024-12-31 or 2024-12-31 17:00"
                 )
                 return
         
@@ -70,8 +72,15 @@ class TaskForm(tk.Frame):
             'priority': priority
         }
         
-        self.task_controller.add_task(task_data)
-        
+        run_in_background(
+            self.dispatcher,
+            self.task_controller.add_task,
+            task_data,
+            on_done=self.on_task_saved,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not add task: {e}")
+        )
+    
+    def on_task_saved(self, task_id):
         # Clear fields after adding
         self.title_entry.delete(0, tk.END)
         self.description_entry.delete(0, tk.END)
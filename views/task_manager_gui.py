@@ -1,8 +1,28 @@
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from views.edit_task_form import EditTaskForm
+from views.refresh_scheduler import RefreshScheduler
 from views.task_form import TaskForm
+from views.virtual_tree import VirtualTreeview
+from controllers.task_controller import ARCHIVE_BATCH_SIZE
+from utils.db_worker import DatabaseWorker, TkDispatcher, run_in_background
+from utils.deadlines import format_deadline
+from utils.query_stats import format_query_stats
+
+logger = logging.getLogger(__name__)
+
+# How often the GUI checks for changes made by other processes
+CHANGE_POLL_MS = 1000
+# Search runs once typing has paused for this long
+SEARCH_DELAY_MS = 250
+# Most search results shown in the current tasks list
+SEARCH_LIMIT = 500
+# How often old completed tasks are archived, and the pause between batches
+# of one run so other database requests are not held up
+ARCHIVE_INTERVAL_MS = 60 * 60 * 1000
+ARCHIVE_PAUSE_MS = 50
 
 class TaskManagerGUI(tk.Tk):
     def __init__(self, task_controller):
@@ -22,12 +42,37 @@ class TaskManagerGUI(tk.Tk):
         
         self.configure(bg='#f0f0f0')
         
+        # Sort order of the current tasks list
+        self.current_order = 'id'
+        
+        # Search shown in the current tasks list, if any. search_generation
+        # drops results of searches that were superseded while running.
+        self.search_query = ''
+        self.search_job = None
+        self.search_generation = 0
+        
+        # All database calls run on a worker thread; results come back to
+        # the Tk thread through the dispatcher
+        self.db_worker = DatabaseWorker()
+        self.dispatcher = TkDispatcher(self, self.db_worker)
+        # Every list refresh goes through here, so bursts of writes redraw
+        # each list once per frame
+        self.refresh_scheduler = RefreshScheduler(self)
+        
         self.create_header()
         self.create_current_tasks_section()
         self.create_completed_tasks_section()
         
         # Initial refresh
         self.refresh_tasks()
+        
+        self.bind('<F12>', self.dump_query_stats)
+        
+        # Pick up writes from other processes, e.g. clear_db.py
+        self.change_feed = None
+        run_in_background(self.dispatcher, self.task_controller.create_change_feed, on_done=self.start_change_polling)
+        
+        self.archive_old_tasks()
     
     def create_header(self):
         header_frame = tk.Frame(self, bg='#6FA7F9')
@@ -85,15 +130,26 @@ class TaskManagerGUI(tk.Tk):
                            highlightthickness=0, borderwidth=0, padx=10)
         date_btn.pack()
         
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(sort_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side='right')
+        self.search_var.trace_add('write', self.on_search_changed)
+        search_entry.bind('<Escape>', self.clear_search)
+        tk.Label(sort_frame, text="Search:", bg='#f0f0f0', fg='black').pack(side='right', padx=(0,5))
+        
         # Tasks Treeview
         columns = ('ID', 'Title', 'Description', 'Deadline', 'Priority')
-        self.current_tasks = ttk.Treeview(self, columns=columns, show='headings', height=5)
-        
-        # Configure columns
-        for col in columns:
-            self.current_tasks.heading(col, text=col)
-            self.current_tasks.column(col, width=100)
-        
+        self.current_tasks = VirtualTreeview(
+            self,
+            columns,
+            self.current_task_values,
+            fetch_rows=self.fetch_current_tasks,
+            count_rows=lambda: self.task_controller.count_tasks(status='Pending'),
+            height=5,
+            dispatcher=self.dispatcher,
+            fetch_after=self.fetch_current_after,
+            fetch_before=self.fetch_current_before
+        )
         self.current_tasks.pack(fill='both', padx=20)
         
         # Action Buttons Frame
@@ -115,23 +171,42 @@ class TaskManagerGUI(tk.Tk):
         delete_btn.pack()
     
     def create_completed_tasks_section(self):
+        completed_header = tk.Frame(self, bg='#f0f0f0')
+        completed_header.pack(fill='x', padx=20, pady=(20,10))
+        
         tk.Label(
-            self,
+            completed_header,
             text="Completed Tasks:",
             font=('Satoshi', 18, 'bold'),
             bg='#f0f0f0',
             fg='black',
             anchor='w'
-        ).pack(padx=20, pady=(20,10), anchor='w')
+        ).pack(side='left')
+        
+        # Archived tasks are only read when asked for, a page at a time
+        self.show_archived = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            completed_header,
+            text="Show archived",
+            variable=self.show_archived,
+            command=self.toggle_archived,
+            bg='#f0f0f0',
+            fg='black'
+        ).pack(side='right')
         
         # Completed Tasks Treeview
         columns = ('Title', 'Description', 'Completion Date')
-        self.completed_tasks = ttk.Treeview(self, columns=columns, show='headings', height=5)
-        
-        for col in columns:
-            self.completed_tasks.heading(col, text=col)
-            self.completed_tasks.column(col, width=100)
-        
+        self.completed_tasks = VirtualTreeview(
+            self,
+            columns,
+            self.completed_task_values,
+            fetch_rows=self.fetch_completed_tasks,
+            count_rows=self.count_completed_tasks,
+            height=5,
+            dispatcher=self.dispatcher,
+            fetch_after=self.fetch_completed_after,
+            fetch_before=self.fetch_completed_before
+        )
         self.completed_tasks.pack(fill='both', padx=20)
         
         # Add Task Button
@@ -157,81 +232,214 @@ class TaskManagerGUI(tk.Tk):
         task_form = TaskForm(
             add_task_window, 
             self.task_controller, 
-            on_task_added=self.refresh_tasks
+            on_task_added=self.refresh_tasks,
+            dispatcher=self.dispatcher
         )
         task_form.pack(fill='both', expand=True)
     
+    def current_task_values(self, task):
+        return (task.id, task.title, task.description, format_deadline(task.deadline), task.priority)
+    
+    def completed_task_values(self, task):
+        completion_date = task.completed_at.strftime('%Y-%m-%d') if task.completed_at else ''
+        return (task.title, task.description, completion_date)
+    
+    def fetch_current_tasks(self, offset, limit):
+        return self.task_controller.query_tasks(
+            status='Pending',
+            order_by=self.current_order,
+            limit=limit,
+            offset=offset
+        )
+    
+    # Keyset reads for scrolling next to the rows already loaded. Each key is
+    # only read once, so they skip the result cache.
+    
+    def fetch_current_after(self, task, limit):
+        order = self.current_order
+        return self.task_controller.query_tasks(
+            status='Pending',
+            order_by=order,
+            limit=limit,
+            after_key=self.task_controller.page_key(task, order),
+            use_cache=False
+        )
+    
+    def fetch_current_before(self, task, limit):
+        order = self.current_order
+        return self.task_controller.query_tasks(
+            status='Pending',
+            order_by=order,
+            limit=limit,
+            before_key=self.task_controller.page_key(task, order),
+            use_cache=False
+        )
+    
+    def fetch_completed_tasks(self, offset, limit):
+        return self.task_controller.query_tasks(status='Completed', order_by='completed_at', limit=limit, offset=offset)
+    
+    def fetch_completed_after(self, task, limit):
+        return self.task_controller.query_tasks(
+            status='Completed',
+            order_by='completed_at',
+            limit=limit,
+            after_key=self.task_controller.page_key(task, 'completed_at'),
+            use_cache=False
+        )
+    
+    def fetch_completed_before(self, task, limit):
+        return self.task_controller.query_tasks(
+            status='Completed',
+            order_by='completed_at',
+            limit=limit,
+            before_key=self.task_controller.page_key(task, 'completed_at'),
+            use_cache=False
+        )
+    
+    def count_completed_tasks(self):
+        return self.task_controller.count_tasks(status='Completed')
+    
+    def fetch_completed_with_archive(self, offset, limit):
+        # Both tables list the most recently completed first, and only tasks
+        # completed before the cutoff are archived, so the archive picks up
+        # where the tasks table ends
+        tasks = self.fetch_completed_tasks(offset, limit)
+        if len(tasks) < limit:
+            live = offset + len(tasks) if tasks else self.count_completed_tasks()
+            tasks += self.task_controller.get_archived_tasks(limit=limit - len(tasks), offset=max(0, offset - live))
+        return tasks
+    
+    def count_completed_with_archive(self):
+        return self.count_completed_tasks() + self.task_controller.count_archived_tasks()
+    
+    def toggle_archived(self):
+        # Rows from two tables have no common key, so with the archive shown
+        # the list pages by offset only
+        if self.show_archived.get():
+            self.completed_tasks.set_source(self.fetch_completed_with_archive, self.count_completed_with_archive)
+        else:
+            self.completed_tasks.set_source(
+                self.fetch_completed_tasks,
+                self.count_completed_tasks,
+                self.fetch_completed_after,
+                self.fetch_completed_before
+            )
+    
+    def archive_old_tasks(self):
+        # One batch per worker request, so requests made meanwhile queue
+        # between batches instead of behind the whole run
+        run_in_background(
+            self.dispatcher,
+            self.task_controller.archive_completed_tasks,
+            max_batches=1,
+            on_done=self.on_tasks_archived
+        )
+    
+    def on_tasks_archived(self, archived):
+        if archived:
+            self.refresh_scheduler.request(self.completed_tasks.refresh)
+        if archived >= ARCHIVE_BATCH_SIZE:
+            self.after(ARCHIVE_PAUSE_MS, self.archive_old_tasks)
+        else:
+            self.after(ARCHIVE_INTERVAL_MS, self.archive_old_tasks)
+    
     def refresh_tasks(self):
-        # Clear current tasks
-        for item in self.current_tasks.get_children():
-            self.current_tasks.delete(item)
-        
-        # Fetch and insert current tasks
-        tasks = self.task_controller.get_all_tasks()
-        for task in tasks:
-            if task.status == 'Pending':
-                deadline_str = task.deadline.strftime('%Y-%m-%d') if task.deadline else ''
-                self.current_tasks.insert('', 'end', values=(
-                    task.id,
-                    task.title,
-                    task.description,
-                    deadline_str,
-                    task.priority
-                ))
-        
-        # Clear completed tasks
-        for item in self.completed_tasks.get_children():
-            self.completed_tasks.delete(item)
-        
-        # Fetch and insert completed tasks
-        for task in tasks:
-            if task.status == 'Completed':
-                completion_date = task.deadline.strftime('%Y-%m-%d') if task.deadline else ''
-                self.completed_tasks.insert('', 'end', values=(
-                    task.title,
-                    task.description,
-                    completion_date
-                ))
+        self.refresh_scheduler.request(self.refresh_current_tasks)
+        self.refresh_scheduler.request(self.completed_tasks.refresh)
+    
+    def refresh_current_tasks(self):
+        if self.search_query:
+            self.run_search()
+        else:
+            self.current_tasks.refresh()
+    
+    def on_search_changed(self, *args):
+        # Debounced: each keystroke restarts the timer
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.apply_search)
+    
+    def clear_search(self, event=None):
+        self.search_var.set('')
+    
+    def apply_search(self):
+        self.search_job = None
+        query = self.search_var.get().strip()
+        if query == self.search_query:
+            return
+        self.search_query = query
+        if query:
+            self.current_tasks.offset = 0
+            self.run_search()
+        else:
+            self.search_generation += 1
+            self.current_tasks.set_source(
+                self.fetch_current_tasks,
+                lambda: self.task_controller.count_tasks(status='Pending'),
+                self.fetch_current_after,
+                self.fetch_current_before
+            )
+    
+    def run_search(self):
+        self.search_generation += 1
+        generation = self.search_generation
+        
+        def searched(results):
+            if generation != self.search_generation:
+                return
+            # The results are already ranked and capped, so the list pages
+            # through them in memory
+            self.current_tasks.fetch_rows = lambda offset, limit: results[offset:offset + limit]
+            self.current_tasks.count_rows = lambda: len(results)
+            self.current_tasks.fetch_after = self.current_tasks.fetch_before = None
+            self.current_tasks.refresh()
+        
+        run_in_background(
+            self.dispatcher,
+            self.task_controller.search_tasks,
+            self.search_query,
+            limit=SEARCH_LIMIT,
+            status='Pending',
+            on_done=searched
+        )
+    
+    def start_change_polling(self, change_feed):
+        self.change_feed = change_feed
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+    
+    def poll_changes(self):
+        # The feed is only ever polled on the worker thread
+        run_in_background(self.dispatcher, self.change_feed.poll, on_done=self.on_changes)
+    
+    def on_changes(self, changes):
+        if changes:
+            self.refresh_tasks()
+        self.after(CHANGE_POLL_MS, self.poll_changes)
     
     def sort_by_priority(self):
-        tasks = self.task_controller.get_all_tasks()
-        pending_tasks = [task for task in tasks if task.status == 'Pending']
-        # Define a priority mapping to sort High > Medium > Low
-        priority_mapping = {'High': 0, 'Medium': 1, 'Low': 2}
-        sorted_tasks = sorted(pending_tasks, key=lambda t: priority_mapping.get(t.priority, 3))
-        self._update_current_tasks_view(sorted_tasks)
+        self.current_order = 'priority'
+        self.current_tasks.offset = 0
+        self.refresh_scheduler.request(self.current_tasks.refresh)
     
     def sort_by_date(self):
-        tasks = self.task_controller.get_all_tasks()
-        pending_tasks = [task for task in tasks if task.status == 'Pending']
-        sorted_tasks = sorted(pending_tasks, key=lambda t: t.deadline or datetime.max)
-        self._update_current_tasks_view(sorted_tasks)
-    
-    def _update_current_tasks_view(self, tasks):
-        # Clear current tasks
-        for item in self.current_tasks.get_children():
-            self.current_tasks.delete(item)
-        
-        # Insert sorted tasks
-        for task in tasks:
-            deadline_str = task.deadline.strftime('%Y-%m-%d') if task.deadline else ''
-            self.current_tasks.insert('', 'end', values=(
-                task.id,
-                task.title,
-                task.description,
-                deadline_str,
-                task.priority
-            ))
+        self.current_order = 'deadline'
+        self.current_tasks.offset = 0
+        self.refresh_scheduler.request(self.current_tasks.refresh)
     
     def edit_selected_task(self):
-        selected_item = self.current_tasks.selection()
-        if not selected_item:
+        selected_ids = self.current_tasks.get_selected_ids()
+        if not selected_ids:
             messagebox.showwarning("No Selection", "Please select a task to edit.")
             return
         
-        task_id = self.current_tasks.item(selected_item)['values'][0]
-        task = self.task_controller.get_task_by_id(task_id)
-        
+        run_in_background(
+            self.dispatcher,
+            self.task_controller.get_task_by_id,
+            selected_ids[0],
+            on_done=self.open_edit_task_window
+        )
+    
+    def open_edit_task_window(self, task):
         if task:
             edit_task_window = tk.Toplevel(self)
             edit_task_window.title("Edit Task")
@@ -241,22 +449,35 @@ class TaskManagerGUI(tk.Tk):
                 edit_task_window,
                 self.task_controller,
                 task,
-                on_task_updated=self.refresh_tasks
+                on_task_updated=self.refresh_tasks,
+                dispatcher=self.dispatcher
             )
             edit_form.pack(fill='both', expand=True)
         else:
             messagebox.showerror("Error", "Task not found.")
     
     def delete_selected_task(self):
-        selected_item = self.current_tasks.selection()
-        if not selected_item:
+        selected_ids = self.current_tasks.get_selected_ids()
+        if not selected_ids:
             messagebox.showwarning("No Selection", "Please select a task to delete.")
             return
         
-        task_id = self.current_tasks.item(selected_item)['values'][0]
+        task_id = selected_ids[0]
         confirm = messagebox.askyesno("Delete Task", "Are you sure you want to delete this task?")
         if confirm:
-            self.task_controller.delete_task(task_id)
-            self.refresh_tasks()
+            run_in_background(
+                self.dispatcher,
+                self.task_controller.delete_task,
+                task_id,
+                on_done=lambda result: self.refresh_tasks()
+            )
+    
+    def dump_query_stats(self, event=None):
+        stats = self.task_controller.db.query_stats
+        if stats is None:
+            logger.info("Query stats are off; set TASK_MANAGER_SLOW_MS to record them")
+        else:
+            logger.info("Query stats:\n%s", format_query_stats(stats.snapshot()))
+        logger.info("Refreshes: %s", self.refresh_scheduler.stats())
     
     # Additional methods can be added as required
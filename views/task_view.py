@@ -1,69 +1,96 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from views.edit_task_form import EditTaskForm
+from views.virtual_tree import VirtualTreeview
+from utils.db_worker import run_in_background
+from utils.deadlines import format_deadline
 
 class TaskView(tk.Frame):
-    def __init__(self, parent, task_controller, show_overlay):
+    def __init__(self, parent, task_controller, show_overlay, dispatcher=None, refresh_scheduler=None):
         super().__init__(parent)
         self.task_controller = task_controller
         self.show_overlay = show_overlay
+        self.dispatcher = dispatcher
+        self.refresh_scheduler = refresh_scheduler
         self.create_widgets()
         self.refresh_tasks()
     
     def create_widgets(self):
         columns = ('ID', 'Title', 'Description', 'Deadline', 'Priority', 'Status')
-        self.tree = ttk.Treeview(
-            self, 
-            columns=columns, 
-            show='headings', 
-            selectmode='browse'
+        # Only the rows on screen are kept as Treeview items
+        self.task_list = VirtualTreeview(
+            self,
+            columns,
+            self.task_values,
+            fetch_rows=lambda offset, limit: self.task_controller.query_tasks(limit=limit, offset=offset),
+            count_rows=self.task_controller.count_tasks,
+            selectmode='browse',
+            dispatcher=self.dispatcher,
+            fetch_after=lambda task, limit: self.task_controller.query_tasks(
+                limit=limit, after_key=(task.id,), use_cache=False
+            ),
+            fetch_before=lambda task, limit: self.task_controller.query_tasks(
+                limit=limit, before_key=(task.id,), use_cache=False
+            )
         )
+        self.tree = self.task_list.tree
         for col in columns:
-            self.tree.heading(col, text=col)
             self.tree.column(col, width=100, anchor='center')
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.task_list.pack(fill=tk.BOTH, expand=True)
         
         # Optional: Bind double-click to edit task
         self.tree.bind("<Double-1>", self.on_double_click)
     
+    def task_values(self, task):
+        deadline = format_deadline(task.deadline)
+        return (
+            task.id, 
+            task.title, 
+            task.description, 
+            deadline, 
+            task.priority, 
+            task.status
+        )
+    
     def refresh_tasks(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        tasks = self.task_controller.get_all_tasks()
-        for task in tasks:
-            deadline = task.deadline.strftime('%Y-%m-%d') if task.deadline else ''
-            self.tree.insert(
-                '', 
-                tk.END, 
-                values=(
-                    task.id, 
-                    task.title, 
-                    task.description, 
-                    deadline, 
-                    task.priority, 
-                    task.status
-                )
-            )
+        if self.refresh_scheduler is None:
+            self.task_list.refresh()
+        else:
+            self.refresh_scheduler.request(self.task_list.refresh)
+    
+    def get_selected_task_id(self):
+        selected = self.task_list.get_selected_ids()
+        return selected[0] if selected else None
     
     def get_selected_task(self):
-        selected = self.tree.selection()
-        if selected:
-            task_id = self.tree.item(selected[0])['values'][0]
+        task_id = self.get_selected_task_id()
+        if task_id is not None:
             return self.task_controller.get_task_by_id(task_id)
         return None
     
     def on_double_click(self, event):
-        selected_item = self.tree.selection()
-        if selected_item:
-            task_id = self.tree.item(selected_item[0])['values'][0]
-            task = self.task_controller.get_task_by_id(task_id)
-            if task:
-                task_data = (
-                    task.id,
-                    task.title,
-                    task.description,
-                    task.deadline.strftime('%Y-%m-%d') if task.deadline else '',
-                    task.priority,
-                    task.status
-                )
-                self.show_overlay(EditTaskForm, task_data, on_task_updated=self.refresh_tasks)
\ No newline at end of file
+        task_id = self.get_selected_task_id()
+        if task_id is not None:
+            run_in_background(
+                self.dispatcher,
+                self.task_controller.get_task_by_id,
+                task_id,
+                on_done=self.open_edit_form
+            )
+    
+    def open_edit_form(self, task):
+        if task:
+            task_data = (
+                task.id,
+                task.title,
+                task.description,
+                format_deadline(task.deadline),
+                task.priority,
+                task.status
+            )
+            self.show_overlay(
+                EditTaskForm,
+                task_data,
+                on_task_updated=self.refresh_tasks,
+                dispatcher=self.dispatcher
+            )
\ No newline at end of file
@@ -0,0 +1,47 @@
+class TreeReconciler:
+    # Applies a list of rows to a Treeview as a diff against what is already
+    # shown. Items are keyed by task id, so an edit updates one row in place,
+    # and unchanged rows keep their selection and focus.
+    def __init__(self, tree):
+        self.tree = tree
+        # task_id -> (item_id, values currently shown)
+        self.items = {}
+        self.stats = {'inserted': 0, 'updated': 0, 'moved': 0, 'removed': 0}
+    
+    def sync(self, rows):
+        # rows is a list of (task_id, values) in display order
+        wanted = {task_id for task_id, values in rows}
+        for task_id in [task_id for task_id in self.items if task_id not in wanted]:
+            item_id, values = self.items.pop(task_id)
+            self.tree.delete(item_id)
+            self.stats['removed'] += 1
+        
+        order = list(self.tree.get_children())
+        for index, (task_id, values) in enumerate(rows):
+            values = tuple(values)
+            entry = self.items.get(task_id)
+            if entry is None:
+                item_id = self.tree.insert('', index, iid=str(task_id), values=values)
+                self.items[task_id] = (item_id, values)
+                order.insert(index, item_id)
+                self.stats['inserted'] += 1
+                continue
+            item_id, shown = entry
+            if shown != values:
+                self.tree.item(item_id, values=values)
+                self.items[task_id] = (item_id, values)
+                self.stats['updated'] += 1
+            if order[index] != item_id:
+                self.tree.move(item_id, '', index)
+                order.remove(item_id)
+                order.insert(index, item_id)
+                self.stats['moved'] += 1
+    
+    def item_id(self, task_id):
+        entry = self.items.get(task_id)
+        return entry[0] if entry else None
+    
+    def clear(self):
+        self.tree.delete(*[item_id for item_id, values in self.items.values()])
+        self.stats['removed'] += len(self.items)
+        self.items.clear()
\ No newline at end of file
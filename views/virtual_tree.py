@@ -0,0 +1,279 @@
+import logging
+import tkinter as tk
+from tkinter import ttk
+from views.tree_sync import TreeReconciler
+from utils.db_worker import run_in_background
+
+logger = logging.getLogger(__name__)
+
+class VirtualTreeview(tk.Frame):
+    # A Treeview that only holds the rows currently on screen. Rows are pulled
+    # from the database by window as the list scrolls, so render time and
+    # memory depend on the viewport height rather than on the number of tasks.
+    #
+    # fetch_rows(offset, limit) returns a list of tasks in display order,
+    # count_rows() returns the total number of rows and row_values(task)
+    # returns the tuple shown for a task. Item ids are the task ids. With a
+    # dispatcher, fetch_rows and count_rows run on the database worker thread.
+    #
+    # fetch_after(task, limit) and fetch_before(task, limit), if given, return
+    # the rows just after or before task, in display order. Scrolling then
+    # extends the buffered rows from their first or last task by keyset
+    # instead of re-reading everything above the viewport with OFFSET, which
+    # is left for refreshes and jumps away from the buffer.
+    def __init__(self, parent, columns, row_values, fetch_rows, count_rows, height=10, overscan=20, selectmode='extended', dispatcher=None, bg='#f0f0f0', fetch_after=None, fetch_before=None):
+        super().__init__(parent, bg=bg)
+        self.dispatcher = dispatcher
+        self.row_values = row_values
+        self.fetch_rows = fetch_rows
+        self.count_rows = count_rows
+        self.fetch_after = fetch_after
+        self.fetch_before = fetch_before
+        self.overscan = overscan
+        self.visible_rows = height
+        
+        self.total = 0
+        self.offset = 0
+        # Rows fetched around the viewport, starting at buffer_offset
+        self.buffer = []
+        self.buffer_offset = 0
+        self.selected_ids = set()
+        self._rendering = False
+        # Bumped by every load so results of superseded loads are dropped
+        self.generation = 0
+        # One load runs at a time; loads requested meanwhile collapse into a
+        # single follow-up load
+        self._loading = False
+        self._load_queued = False
+        self._queued_with_count = False
+        
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=height, selectmode=selectmode)
+        self.reconciler = TreeReconciler(self.tree)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+        
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_rows(3))
+        self.tree.bind('<Up>', lambda event: self.on_arrow(-1))
+        self.tree.bind('<Down>', lambda event: self.on_arrow(1))
+        self.tree.bind('<Prior>', lambda event: self.scroll_rows(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.scroll_rows(self.visible_rows))
+    
+    def set_source(self, fetch_rows, count_rows, fetch_after=None, fetch_before=None):
+        self.fetch_rows = fetch_rows
+        self.count_rows = count_rows
+        self.fetch_after = fetch_after
+        self.fetch_before = fetch_before
+        self.offset = 0
+        self.refresh()
+    
+    def refresh(self):
+        # Drop cached rows and re-read the count and the window at the
+        # current position
+        self.load(with_count=True)
+    
+    def load(self, with_count=False):
+        if self._loading:
+            self._load_queued = True
+            self._queued_with_count = self._queued_with_count or with_count
+            return
+        self._loading = True
+        self.generation += 1
+        generation = self.generation
+        offset = self.offset
+        visible = self.visible_rows
+        overscan = self.overscan
+        fetch_rows = self.fetch_rows
+        count_rows = self.count_rows
+        limit = visible + 2 * overscan
+        if not with_count and self.load_adjacent(generation, offset, limit):
+            return
+        
+        def fetch():
+            total = count_rows() if with_count else None
+            position = offset if total is None else min(offset, max(0, total - visible))
+            start = max(0, position - overscan)
+            return total, start, fetch_rows(start, limit)
+        
+        def loaded(result):
+            if self._finish_load():
+                # A newer load replaced this one; its rows are already stale
+                return
+            if generation != self.generation:
+                return
+            total, start, rows = result
+            if total is not None:
+                self.total = total
+            if len(rows) < limit:
+                # A short read means the table ends here
+                self.total = start + len(rows)
+            self.buffer_offset = start
+            self.buffer = rows
+            self.render()
+        
+        def failed(error):
+            self._finish_load()
+            logger.error("Loading rows failed: %r", error)
+        
+        run_in_background(self.dispatcher, fetch, on_done=loaded, on_error=failed)
+    
+    def load_adjacent(self, generation, offset, limit):
+        # Loads the window by keyset when it starts or ends inside the buffer,
+        # keeping the buffered rows it shares. Returns False if it can't.
+        if not self.buffer or self.fetch_after is None or self.fetch_before is None:
+            return False
+        start = max(0, offset - self.overscan)
+        buffer_end = self.buffer_offset + len(self.buffer)
+        if self.buffer_offset <= start <= buffer_end:
+            kept = self.buffer[start - self.buffer_offset:]
+            fetch, anchor, forward = self.fetch_after, self.buffer[-1], True
+        elif start < self.buffer_offset < start + limit:
+            kept = self.buffer[:start + limit - self.buffer_offset]
+            fetch, anchor, forward = self.fetch_before, self.buffer[0], False
+        else:
+            return False
+        wanted = limit - len(kept)
+        if wanted <= 0:
+            return False
+        
+        def loaded(rows):
+            if self._finish_load() or generation != self.generation:
+                return
+            if forward:
+                if len(rows) < wanted:
+                    # A short read means the table ends here
+                    self.total = start + len(kept) + len(rows)
+                self.buffer_offset = start
+                self.buffer = kept + rows
+            else:
+                # A short read means the table starts here
+                self.buffer_offset = start if len(rows) == wanted else 0
+                self.buffer = rows + kept
+            self.render()
+        
+        def failed(error):
+            self._finish_load()
+            logger.error("Loading rows failed: %r", error)
+        
+        run_in_background(self.dispatcher, fetch, anchor, wanted, on_done=loaded, on_error=failed)
+        return True
+    
+    def _finish_load(self):
+        # Ends the running load and starts the queued one, if any. Returns
+        # whether one was started.
+        self._loading = False
+        if not self._load_queued:
+            return False
+        with_count = self._queued_with_count
+        self._load_queued = self._queued_with_count = False
+        self.load(with_count)
+        return True
+    
+    def max_offset(self):
+        return max(0, self.total - self.visible_rows)
+    
+    def covers_window(self):
+        start = self.offset - self.buffer_offset
+        end = min(self.offset + self.visible_rows, self.total) - self.buffer_offset
+        return start >= 0 and end <= len(self.buffer)
+    
+    def render(self):
+        self.offset = min(max(0, self.offset), self.max_offset())
+        if not self.covers_window():
+            # Keep showing the current rows until the window arrives
+            self.update_scrollbar()
+            self.load()
+            return
+        start = self.offset - self.buffer_offset
+        rows = self.buffer[start:start + self.visible_rows]
+        self._rendering = True
+        try:
+            # Only rows that changed, appeared or moved touch the Treeview
+            self.reconciler.sync([(task.id, self.row_values(task)) for task in rows])
+            visible_selection = [str(task.id) for task in rows if task.id in self.selected_ids]
+            if set(visible_selection) != set(self.tree.selection()):
+                self.tree.selection_set(visible_selection)
+            self.tree.yview_moveto(0)
+        finally:
+            self._rendering = False
+        self.update_scrollbar()
+    
+    def update_scrollbar(self):
+        if self.total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            first = self.offset / self.total
+            last = min(self.offset + self.visible_rows, self.total) / self.total
+            self.scrollbar.set(first, last)
+    
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows
+            self.offset += step
+        self.render()
+    
+    def scroll_rows(self, count):
+        previous = self.offset
+        self.offset = min(max(0, self.offset + count), self.max_offset())
+        if self.offset != previous:
+            self.render()
+        return 'break'
+    
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self.scroll_rows(step * 3)
+    
+    def on_arrow(self, step):
+        # Moving past the first or last visible row scrolls the window
+        items = self.tree.get_children()
+        selection = self.tree.selection()
+        if not items or not selection:
+            return None
+        index = items.index(selection[0])
+        if (step < 0 and index == 0) or (step > 0 and index == len(items) - 1):
+            if self.scroll_rows(step) and self.tree.get_children():
+                items = self.tree.get_children()
+                target = items[0] if step < 0 else items[-1]
+                self.tree.selection_set(target)
+                self.tree.focus(target)
+            return 'break'
+        return None
+    
+    def on_resize(self, event):
+        items = self.tree.get_children()
+        if not items:
+            return
+        bbox = self.tree.bbox(items[0])
+        if not bbox:
+            return
+        # bbox gives the header height as y and the row height as height
+        rows = max(1, (event.height - bbox[1]) // bbox[3])
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+    
+    def on_select(self, event):
+        if self._rendering:
+            return
+        selection = {int(iid) for iid in self.tree.selection()}
+        if selection and str(self.tree.cget('selectmode')) == 'browse':
+            self.selected_ids = selection
+            return
+        # Keep remembered selections that are scrolled out of view
+        self.selected_ids -= {int(iid) for iid in self.tree.get_children()}
+        self.selected_ids |= selection
+    
+    def get_selected_ids(self):
+        return [int(iid) for iid in self.tree.selection()] or sorted(self.selected_ids)
\ No newline at end of file